@@ -8,7 +8,6 @@ JSON形式の業務フローデータからBPMN 2.0 XMLを生成し、
 from __future__ import annotations
 
 import argparse
-import json
 import logging
 import sys
 from pathlib import Path
@@ -18,6 +17,7 @@ from xml.dom import minidom
 
 from src.core.bpmn_layout import BPMNLayoutEngine, BPMNNodeLayout, BPMNLaneLayout
 from src.core.bpmn_validator import validate_bpmn
+from src.utils import json_io
 
 logger = logging.getLogger(__name__)
 
@@ -522,8 +522,7 @@ def convert_json_to_bpmn(
     if not json_path.exists():
         raise FileNotFoundError(f"入力ファイルが見つかりません: {json_path}")
 
-    with json_path.open('r', encoding='utf-8') as f:
-        flow = json.load(f)
+    flow = json_io.read_json(json_path)
 
     if debug:
         logger.info(f"入力ファイル読み込み完了: {json_path}")
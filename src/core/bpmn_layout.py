@@ -75,6 +75,24 @@ class BPMNLayoutEngine:
         self._margin_x = 50
         self._margin_y = 50
 
+        # ノードID・フェーズIDからの逆引き表（同一IDが重複する場合は先頭を優先し、タスクをゲートウェイより優先する）
+        self._tasks_by_id: Dict[str, Dict[str, Any]] = {}
+        for task in self.tasks:
+            self._tasks_by_id.setdefault(task["id"], task)
+        self._gateways_by_id: Dict[str, Dict[str, Any]] = {}
+        for gateway in self.gateways:
+            self._gateways_by_id.setdefault(gateway["id"], gateway)
+        phase_index: Dict[str, int] = {}
+        for idx, phase in enumerate(self.phases):
+            phase_index.setdefault(phase["id"], idx)
+        # 同一IDのタスクが複数ある場合は、既知のフェーズを指す最初のタスクを採用する
+        self._task_phase_index: Dict[str, int] = {}
+        for task in self.tasks:
+            if task["id"] not in self._task_phase_index:
+                phase_idx = phase_index.get(task.get("phase_id", ""))
+                if phase_idx is not None:
+                    self._task_phase_index[task["id"]] = phase_idx
+
         # グラフ構造の構築
         self._build_graph()
 
@@ -92,29 +110,27 @@ class BPMNLayoutEngine:
 
     def _get_node_kind(self, node_id: str) -> str:
         """ノードIDから種類を判定する。"""
-        for task in self.tasks:
-            if task["id"] == node_id:
-                return "task"
-        for gateway in self.gateways:
-            if gateway["id"] == node_id:
-                return "gateway"
+        if node_id in self._tasks_by_id:
+            return "task"
+        if node_id in self._gateways_by_id:
+            return "gateway"
         return "unknown"
 
     def _get_node_label(self, node_id: str) -> str:
         """ノードIDからラベルを取得する。"""
-        for task in self.tasks:
-            if task["id"] == node_id:
-                return task.get("name", node_id)
-        for gateway in self.gateways:
-            if gateway["id"] == node_id:
-                return gateway.get("name", "")
+        task = self._tasks_by_id.get(node_id)
+        if task is not None:
+            return task.get("name", node_id)
+        gateway = self._gateways_by_id.get(node_id)
+        if gateway is not None:
+            return gateway.get("name", "")
         return node_id
 
     def _get_node_actor(self, node_id: str) -> str:
         """ノードIDから所属するactorを取得する。"""
-        for task in self.tasks:
-            if task["id"] == node_id:
-                return task.get("actor_id", "")
+        task = self._tasks_by_id.get(node_id)
+        if task is not None:
+            return task.get("actor_id", "")
 
         # ゲートウェイの場合は隣接ノードから推測
         neighbors = self.graph.get(node_id, []) + self.reverse_graph.get(node_id, [])
@@ -162,12 +178,9 @@ class BPMNLayoutEngine:
 
     def _assign_to_phase(self, node_id: str, layers: List[List[str]]) -> int:
         """ノードをフェーズ（階層）に割り当てる。"""
-        for task in self.tasks:
-            if task["id"] == node_id:
-                phase_id = task.get("phase_id", "")
-                for idx, phase in enumerate(self.phases):
-                    if phase["id"] == phase_id:
-                        return idx
+        phase_idx = self._task_phase_index.get(node_id)
+        if phase_idx is not None:
+            return phase_idx
 
         # フェーズ情報がない場合はトポロジカルソートの階層を使用
         for layer_idx, layer in enumerate(layers):
@@ -202,6 +215,11 @@ class BPMNLayoutEngine:
 
     def _order_by_barycenter(self, layer: List[str], reference_layer: List[str], direction: str) -> List[str]:
         """バリセントリック値に基づいてノードを並べ替える。"""
+        # 参照階層内の位置は list.index の線形探索ではなく事前に作った表から引く
+        reference_positions: Dict[str, int] = {}
+        for idx, node_id in enumerate(reference_layer):
+            reference_positions.setdefault(node_id, idx)
+
         def barycenter(node_id: str) -> float:
             if direction == "down":
                 neighbors = self.reverse_graph.get(node_id, [])
@@ -211,7 +229,7 @@ class BPMNLayoutEngine:
             if not neighbors:
                 return len(reference_layer) / 2
 
-            positions = [reference_layer.index(n) for n in neighbors if n in reference_layer]
+            positions = [reference_positions[n] for n in neighbors if n in reference_positions]
             return sum(positions) / len(positions) if positions else len(reference_layer) / 2
 
         return sorted(layer, key=barycenter)
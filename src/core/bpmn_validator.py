@@ -7,6 +7,7 @@ BPMN 2.0準拠性検証モジュール。
 from __future__ import annotations
 
 import xml.etree.ElementTree as ET
+from collections import Counter
 from typing import Dict, List, Tuple
 
 
@@ -188,15 +189,19 @@ class BPMNValidator:
         if self.root is None:
             return {}
 
+        # 要素種別ごとに findall で木を走査し直さず、1回の走査でタグ数をまとめて数える
+        counts = Counter(elem.tag for elem in self.root.iter())
+        counts[self.root.tag] -= 1  # findall('.//...') と同様にルート自身は数えない
+
+        def count(local_name: str) -> int:
+            return counts[f"{{{self.NAMESPACES['bpmn2']}}}{local_name}"]
+
         return {
-            'tasks': len(self.root.findall('.//bpmn2:userTask', self.NAMESPACES)) +
-                     len(self.root.findall('.//bpmn2:serviceTask', self.NAMESPACES)),
-            'gateways': len(self.root.findall('.//bpmn2:exclusiveGateway', self.NAMESPACES)) +
-                        len(self.root.findall('.//bpmn2:parallelGateway', self.NAMESPACES)) +
-                        len(self.root.findall('.//bpmn2:inclusiveGateway', self.NAMESPACES)),
-            'sequence_flows': len(self.root.findall('.//bpmn2:sequenceFlow', self.NAMESPACES)),
-            'lanes': len(self.root.findall('.//bpmn2:lane', self.NAMESPACES)),
-            'participants': len(self.root.findall('.//bpmn2:participant', self.NAMESPACES)),
+            'tasks': count('userTask') + count('serviceTask'),
+            'gateways': count('exclusiveGateway') + count('parallelGateway') + count('inclusiveGateway'),
+            'sequence_flows': count('sequenceFlow'),
+            'lanes': count('lane'),
+            'participants': count('participant'),
         }
 
 
@@ -11,15 +11,21 @@ This module provides:
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import logging
+import os
 import pathlib
 import re
-from dataclasses import asdict, dataclass
+import sys
+from dataclasses import dataclass
 from datetime import date
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from src.core.llm_client import LLMClient, create_llm_client, detect_provider
+from src.core.exceptions import SchemaValidationError
+from src.core import llm_client
+from src.core.llm_client import LLMClient
+from src.utils import json_io
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +34,17 @@ try:
 except ImportError:  # pragma: no cover - optional dependency
     jsonschema = None  # type: ignore
 
+try:
+    import fastjsonschema  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    fastjsonschema = None  # type: ignore
+
 
-@dataclass
+# slots=True は Python 3.10 以降のみ対応（README 記載の 3.9 では通常の dataclass にフォールバック）
+_DATACLASS_OPTIONS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class FlowDocument:
     actors: List[Dict[str, Any]]
     phases: List[Dict[str, Any]]
@@ -40,9 +55,21 @@ class FlowDocument:
     metadata: Optional[Dict[str, Any]] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        payload = asdict(self)
+        # asdict() は入れ子の dict/list を再帰的に deep copy するため、属性から直接組み立てる。
+        # 戻り値はフィールドを共有するので、呼び出し側は直ちにシリアライズする前提。
+        payload: Dict[str, Any] = {
+            "actors": self.actors,
+            "phases": self.phases,
+            "tasks": self.tasks,
+            "flows": self.flows,
+            "issues": self.issues,
+        }
         # Remove None entries for optional fields
-        return {k: v for k, v in payload.items() if v is not None}
+        if self.gateways is not None:
+            payload["gateways"] = self.gateways
+        if self.metadata is not None:
+            payload["metadata"] = self.metadata
+        return payload
 
 
 class DummyLLMClient:
@@ -50,14 +77,72 @@ class DummyLLMClient:
 
     def __init__(self, stub_path: pathlib.Path) -> None:
         self._stub_path = stub_path
+        # ファイルI/Oは初回のみ。呼び出しごとにパースして独立したオブジェクトを返す
+        self._payload = stub_path.read_bytes()
 
     def structured_flow(self, *, messages: List[Dict[str, str]], schema: Dict[str, Any], model: str) -> Dict[str, Any]:
         _ = messages, schema, model
-        return json.loads(self._stub_path.read_text(encoding="utf-8"))
+        return json_io.loads(self._payload)
+
+
+# load_schema が返したスキーマ辞書の id -> (辞書, バリデータキャッシュ用キー)。
+# 辞書自体も保持するため、id が別オブジェクトに再利用されることはない。
+_LOADED_SCHEMA_KEYS: Dict[int, Tuple[Dict[str, Any], str]] = {}
+
+
+@functools.lru_cache(maxsize=8)
+def _load_schema_cached(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    _ = mtime_ns, size  # キャッシュキー専用（ファイル更新時に再読込させる）
+    schema = json_io.read_json(pathlib.Path(path_str))
+    if len(_LOADED_SCHEMA_KEYS) >= 8:
+        _LOADED_SCHEMA_KEYS.clear()
+    # バリデータ取得のたびにスキーマ全体をシリアライズしないよう、読み込み時に一度だけキーを作る
+    _LOADED_SCHEMA_KEYS[id(schema)] = (schema, _serialize_schema(schema))
+    return schema
 
 
 def load_schema(schema_path: pathlib.Path) -> Dict[str, Any]:
-    return json.loads(schema_path.read_text(encoding="utf-8"))
+    """JSON Schema を読み込む。
+
+    同一パス・同一更新時刻・同一サイズのファイルはキャッシュ済みの辞書を返すため、
+    呼び出し側で内容を変更しないこと。
+    """
+    stat = schema_path.stat()
+    return _load_schema_cached(str(schema_path), stat.st_mtime_ns, stat.st_size)
+
+
+# システムプロンプト（入力に依存しないためモジュール読み込み時に一度だけ構築する）
+_SYSTEM_PROMPT = (
+    "あなたは業務フローアーキテクトです。\n"
+    "業務文書を読み、actors / phases / tasks / flows / gateways / issues / metadata を含む JSON を生成してください。\n\n"
+    "【重要】タスクとゲートウェイの使い分け（BPMN 2.0準拠）:\n"
+    "◆ タスク (tasks): 人間またはシステムが実行する具体的な作業単位\n"
+    "  - 実際の作業や操作を表す（申請書作成、見積取得、承認作業、発注処理など）\n"
+    "  - 時間とリソースを消費する活動\n"
+    "  - 例: ✅「申請書作成」「部長承認」「発注処理」\n"
+    "  - 非該当: ❌「金額判定」「条件分岐」（これらはゲートウェイ）\n\n"
+    "◆ ゲートウェイ (gateways): フローの分岐・合流を制御する要素\n"
+    "  - 判定ロジックそのものを表現（作業は行わない）\n"
+    "  - type: exclusive（排他的・1つ選択）/ parallel（並行・すべて実行）/ inclusive（包含的・複数選択可）\n"
+    "  - 必ず2つ以上の出力フローが必要\n"
+    "  - 例: ✅「10万円以上か判定」「承認結果分岐」「並行処理開始」\n\n"
+    "【黄金ルール】:\n"
+    "1. 実作業はタスク、判定・分岐はゲートウェイ\n"
+    "2. タスクとゲートウェイを重複させない（同じ内容で両方定義しない）\n"
+    "3. 承認プロセス = 「承認タスク」→「承認結果ゲートウェイ」の組み合わせ\n"
+    "4. システムによる自動判定はゲートウェイで表現\n"
+    "5. 並行処理は parallel ゲートウェイで表現\n\n"
+    "【JSON生成ルール】:\n"
+    "1. JSON Schema に準拠し、snake_case キーを維持する\n"
+    "2. flows[].from/to は必ず tasks[].id または gateways[].id を参照する\n"
+    "3. 曖昧または不明な情報は issues[].note に記録する\n"
+    "4. flows[].condition は分岐がある場合のみ記載する\n"
+    "5. tasks[].handoff_to は空配列でも必ず含める\n"
+    "6. 出力は純粋な JSON（```マークダウンブロックは不要）\n"
+)
+
+# ユーザーメッセージの定型前置き（few-shot 例と実入力で共通）
+_USER_PROMPT_PREFIX = "以下の業務文書からフローJSONを生成してください:\n\n"
 
 
 def _load_few_shot_examples() -> List[Dict[str, str]]:
@@ -81,7 +166,7 @@ def _load_few_shot_examples() -> List[Dict[str, str]]:
             example_output = example_output_path.read_text(encoding="utf-8")
 
             examples.append({
-                "user": f"以下の業務文書からフローJSONを生成してください:\n\n{example_input}",
+                "user": _USER_PROMPT_PREFIX + example_input,
                 "assistant": example_output
             })
         except FileNotFoundError:
@@ -103,41 +188,12 @@ def build_messages(input_text: str) -> List[Dict[str, str]]:
     Returns:
         messagesリスト（system, user, assistant, userロール）
     """
-    # システムプロンプト
-    system_prompt = (
-        "あなたは業務フローアーキテクトです。\n"
-        "業務文書を読み、actors / phases / tasks / flows / gateways / issues / metadata を含む JSON を生成してください。\n\n"
-        "【重要】タスクとゲートウェイの使い分け（BPMN 2.0準拠）:\n"
-        "◆ タスク (tasks): 人間またはシステムが実行する具体的な作業単位\n"
-        "  - 実際の作業や操作を表す（申請書作成、見積取得、承認作業、発注処理など）\n"
-        "  - 時間とリソースを消費する活動\n"
-        "  - 例: ✅「申請書作成」「部長承認」「発注処理」\n"
-        "  - 非該当: ❌「金額判定」「条件分岐」（これらはゲートウェイ）\n\n"
-        "◆ ゲートウェイ (gateways): フローの分岐・合流を制御する要素\n"
-        "  - 判定ロジックそのものを表現（作業は行わない）\n"
-        "  - type: exclusive（排他的・1つ選択）/ parallel（並行・すべて実行）/ inclusive（包含的・複数選択可）\n"
-        "  - 必ず2つ以上の出力フローが必要\n"
-        "  - 例: ✅「10万円以上か判定」「承認結果分岐」「並行処理開始」\n\n"
-        "【黄金ルール】:\n"
-        "1. 実作業はタスク、判定・分岐はゲートウェイ\n"
-        "2. タスクとゲートウェイを重複させない（同じ内容で両方定義しない）\n"
-        "3. 承認プロセス = 「承認タスク」→「承認結果ゲートウェイ」の組み合わせ\n"
-        "4. システムによる自動判定はゲートウェイで表現\n"
-        "5. 並行処理は parallel ゲートウェイで表現\n\n"
-        "【JSON生成ルール】:\n"
-        "1. JSON Schema に準拠し、snake_case キーを維持する\n"
-        "2. flows[].from/to は必ず tasks[].id または gateways[].id を参照する\n"
-        "3. 曖昧または不明な情報は issues[].note に記録する\n"
-        "4. flows[].condition は分岐がある場合のみ記載する\n"
-        "5. tasks[].handoff_to は空配列でも必ず含める\n"
-        "6. 出力は純粋な JSON（```マークダウンブロックは不要）\n"
-    )
 
     # Few-shot examplesを読み込む
     examples = _load_few_shot_examples()
 
     # メッセージリストの構築
-    messages = [{"role": "system", "content": system_prompt}]
+    messages = [{"role": "system", "content": _SYSTEM_PROMPT}]
 
     # Few-shot examplesを追加（段階的に複雑度が上がる順）
     for example in examples:
@@ -145,14 +201,23 @@ def build_messages(input_text: str) -> List[Dict[str, str]]:
         messages.append({"role": "assistant", "content": example["assistant"]})
 
     # 実際のユーザー入力を追加
-    messages.append({"role": "user", "content": f"以下の業務文書からフローJSONを生成してください:\n\n{input_text}"})
+    messages.append({"role": "user", "content": _USER_PROMPT_PREFIX + input_text})
 
     return messages
 
 
 
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+@functools.lru_cache(maxsize=1024)
 def _slugify_id(value: str, prefix: str, idx: int) -> str:
-    base = re.sub(r"[^a-z0-9]+", "_", value.lower()).strip("_")
+    lowered = value.lower()
+    if lowered.isascii() and lowered.isalnum():
+        # 英数字のみなら置換対象がないため正規表現を通さない
+        base = lowered
+    else:
+        base = _SLUG_RE.sub("_", lowered).strip("_")
     if not base:
         base = f"{prefix}_{idx}"
     if not base.startswith(prefix):
@@ -189,17 +254,18 @@ def _normalize_actors(raw_actors: List[Dict[str, Any]]) -> Tuple[List[Dict[str,
         (正規化されたactors配列, {name/id -> id}のルックアップ辞書)
     """
     actors = []
-    actor_lookup = {}
+    slugify = _slugify_id
+    append = actors.append
     for idx, actor in enumerate(raw_actors, start=1):
         name = actor.get("name") or actor.get("title") or actor.get("role") or f"actor_{idx}"
-        actor_id = actor.get("id") or _slugify_id(name, "actor", idx)
+        actor_id = actor.get("id") or slugify(name, "actor", idx)
         actor_type = actor.get("type") or ("system" if "system" in (actor.get("role", "").lower()) else "human")
         filtered = {"id": actor_id, "name": name, "type": actor_type}
-        if "notes" in actor:
-            filtered["notes"] = actor["notes"]
-        actors.append(filtered)
-        actor_lookup[name] = actor_id
-        actor_lookup[actor_id] = actor_id
+        if (notes := actor.get("notes")) is not None:
+            filtered["notes"] = notes
+        append(filtered)
+    # 名前→ID と ID→ID をまとめて構築（名前とIDが衝突した場合はIDを優先）
+    actor_lookup = {a["name"]: a["id"] for a in actors} | {a["id"]: a["id"] for a in actors}
     return actors, actor_lookup
 
 
@@ -213,16 +279,17 @@ def _normalize_phases(raw_phases: List[Dict[str, Any]]) -> Tuple[List[Dict[str,
         (正規化されたphases配列, {name/id -> id}のルックアップ辞書)
     """
     phases = []
-    phase_lookup = {}
+    slugify = _slugify_id
+    append = phases.append
     for idx, phase in enumerate(raw_phases, start=1):
         name = phase.get("name") or phase.get("title") or f"phase_{idx}"
-        phase_id = phase.get("id") or _slugify_id(name, "phase", idx)
+        phase_id = phase.get("id") or slugify(name, "phase", idx)
         filtered = {"id": phase_id, "name": name}
-        if "description" in phase:
-            filtered["description"] = phase["description"]
-        phases.append(filtered)
-        phase_lookup[name] = phase_id
-        phase_lookup[phase_id] = phase_id
+        if (description := phase.get("description")) is not None:
+            filtered["description"] = description
+        append(filtered)
+    # 名前→ID と ID→ID をまとめて構築（名前とIDが衝突した場合はIDを優先）
+    phase_lookup = {p["name"]: p["id"] for p in phases} | {p["id"]: p["id"] for p in phases}
     return phases, phase_lookup
 
 
@@ -246,30 +313,39 @@ def _normalize_tasks(
         正規化されたtasks配列
     """
     tasks = []
+    # ループ内で再解決しないよう、参照先とフォールバックIDを先に束縛する
+    get_phase_id = phase_lookup.get
+    get_actor_id = actor_lookup.get
+    default_phase_id = phases[0]["id"] if phases else None
+    default_actor_id = actors[0]["id"] if actors else None
+    slugify = _slugify_id
+    as_list = _as_list
+    append = tasks.append
     for idx, task in enumerate(raw_tasks, start=1):
         name = task.get("name") or task.get("title") or f"task_{idx}"
-        task_id = task.get("id") or _slugify_id(name, "task", idx)
-        phase_key = _pick_identifier(task.get("phase_id") or task.get("phase"))
-        phase_id = phase_lookup.get(phase_key)
-        if not phase_id:
-            phase_id = phases[0]["id"]
-        actor_key = _pick_identifier(task.get("actor_id") or task.get("actor"))
-        actor_id = actor_lookup.get(actor_key)
-        if not actor_id:
-            actor_id = actors[0]["id"]
+        task_id = task.get("id") or slugify(name, "task", idx)
+        # 文字列（大半のケース）は _pick_identifier を経由せずそのまま参照する
+        phase_key = task.get("phase_id") or task.get("phase")
+        if not isinstance(phase_key, str):
+            phase_key = _pick_identifier(phase_key)
+        phase_id = get_phase_id(phase_key) or default_phase_id
+        actor_key = task.get("actor_id") or task.get("actor")
+        if not isinstance(actor_key, str):
+            actor_key = _pick_identifier(actor_key)
+        actor_id = get_actor_id(actor_key) or default_actor_id
         entry = {
             "id": task_id,
             "name": name,
             "actor_id": actor_id,
             "phase_id": phase_id,
         }
-        entry["handoff_to"] = _as_list(task.get("handoff_to"))
-        systems = _as_list(task.get("systems"))
+        entry["handoff_to"] = as_list(task.get("handoff_to"))
+        systems = as_list(task.get("systems"))
         if systems:
             entry["systems"] = systems
-        if "notes" in task:
-            entry["notes"] = task["notes"]
-        tasks.append(entry)
+        if (notes := task.get("notes")) is not None:
+            entry["notes"] = notes
+        append(entry)
     return tasks
 
 
@@ -284,18 +360,20 @@ def _normalize_flows(raw_flows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     flows = []
     for idx, flow in enumerate(raw_flows, start=1):
-        flow_id = flow.get("id") or f"flow_{idx}"
-        entry = {
-            "id": flow_id,
-            "from": flow.get("from") or flow.get("source") or "",
-            "to": flow.get("to") or flow.get("target") or "",
-        }
-        if flow.get("condition"):
-            entry["condition"] = flow["condition"]
-        if flow.get("notes"):
-            entry["notes"] = flow["notes"]
+        # from/to が欠けたフローは組み立て前に除外し、後段の再フィルタを不要にする
+        source = flow.get("from") or flow.get("source")
+        if not source:
+            continue
+        target = flow.get("to") or flow.get("target")
+        if not target:
+            continue
+        entry = {"id": flow.get("id") or f"flow_{idx}", "from": source, "to": target}
+        if condition := flow.get("condition"):
+            entry["condition"] = condition
+        if notes := flow.get("notes"):
+            entry["notes"] = notes
         flows.append(entry)
-    return [f for f in flows if f["from"] and f["to"]]
+    return flows
 
 
 def _normalize_gateways(raw_gateways: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -312,8 +390,8 @@ def _normalize_gateways(raw_gateways: List[Dict[str, Any]]) -> List[Dict[str, An
         name = gateway.get("name") or gateway.get("title") or f"gateway_{idx}"
         gateway_id = gateway.get("id") or _slugify_id(name, "gateway", idx)
         entry = {"id": gateway_id, "name": name, "type": gateway.get("type", "exclusive")}
-        if "notes" in gateway:
-            entry["notes"] = gateway["notes"]
+        if (notes := gateway.get("notes")) is not None:
+            entry["notes"] = notes
         gateways.append(entry)
     return gateways
 
@@ -422,10 +500,86 @@ def normalize_flow_document(raw: dict) -> dict:
 
 
 
-def validate(document: Dict[str, Any], schema: Dict[str, Any]) -> None:
-    if jsonschema is None:
+@functools.lru_cache(maxsize=32)
+def _get_validator(schema_key: str) -> Any:
+    """シリアライズ済みスキーマからコンパイル済みバリデータを生成しキャッシュする。
+
+    Args:
+        schema_key: ``json.dumps(schema, sort_keys=True)`` で正規化したスキーマ文字列
+
+    Returns:
+        スキーマの ``$schema`` に対応する jsonschema バリデータインスタンス
+    """
+    schema = json.loads(schema_key)
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
+@functools.lru_cache(maxsize=32)
+def _get_fast_validator(schema_key: str) -> Callable[[Dict[str, Any]], Any]:
+    """fastjsonschema でスキーマをPython関数にコンパイルしキャッシュする。
+
+    Args:
+        schema_key: ``json.dumps(schema, sort_keys=True)`` で正規化したスキーマ文字列
+
+    Returns:
+        ドキュメントを受け取り、不正な場合は ``JsonSchemaException`` を送出する検証関数
+    """
+    # use_default=False: スキーマの default 値をドキュメントへ書き込ませない
+    return fastjsonschema.compile(json.loads(schema_key), use_default=False)
+
+
+VALIDATOR_BACKENDS = ("jsonschema", "fastjsonschema")
+
+
+def _serialize_schema(schema: Dict[str, Any]) -> str:
+    # 同一内容のスキーマはキャッシュ済みバリデータを共有し、check_schema の再実行を避ける
+    return json.dumps(schema, sort_keys=True, ensure_ascii=False)
+
+
+def _schema_key(schema: Dict[str, Any]) -> str:
+    """バリデータキャッシュ用のキーを返す（load_schema 由来の辞書は読み込み時のキーを再利用する）。"""
+    loaded = _LOADED_SCHEMA_KEYS.get(id(schema))
+    if loaded is not None and loaded[0] is schema:
+        return loaded[1]
+    return _serialize_schema(schema)
+
+
+def validate(document: Dict[str, Any], schema: Dict[str, Any], backend: Optional[str] = None) -> None:
+    """document を JSON Schema で検証する。
+
+    Args:
+        document: 検証対象のフローJSON
+        schema: JSON Schema
+        backend: "jsonschema" / "fastjsonschema"。None の場合は fastjsonschema を優先して自動選択
+
+    Raises:
+        RuntimeError: 指定（または利用可能）なバックエンドが未インストールの場合
+        ValueError: 未知のバックエンドが指定された場合
+    """
+    if backend is not None and backend not in VALIDATOR_BACKENDS:
+        raise ValueError(f"未知のバリデータです: {backend}（{', '.join(VALIDATOR_BACKENDS)} のいずれかを指定）")
+    if backend == "fastjsonschema" and fastjsonschema is None:
+        raise RuntimeError("fastjsonschema が未インストールです。`pip install fastjsonschema` を実行してください。")
+    if backend == "jsonschema" and jsonschema is None:
+        raise RuntimeError("jsonschema が未インストールのため検証できません。`pip install jsonschema` を実行してください。")
+    if jsonschema is None and fastjsonschema is None:
         raise RuntimeError("jsonschema が未インストールのため検証できません。`pip install jsonschema` を実行してください。")
-    jsonschema.validate(instance=document, schema=schema)
+    schema_key = _schema_key(schema)
+
+    if fastjsonschema is not None and backend != "jsonschema":
+        try:
+            _get_fast_validator(schema_key)(document)
+            return
+        except fastjsonschema.JsonSchemaException as exc:
+            if jsonschema is None:
+                raise SchemaValidationError(f"JSON Schema 検証に失敗しました: {exc}") from exc
+            # エラーメッセージを従来と揃えるため jsonschema で再評価する
+
+    error = jsonschema.exceptions.best_match(_get_validator(schema_key).iter_errors(document))
+    if error is not None:
+        raise error
 
 
 def generate_flow(
@@ -435,17 +589,23 @@ def generate_flow(
     model: str,
     use_stub: Optional[pathlib.Path] = None,
     skip_validation: bool = False,
+    validator: Optional[str] = None,
+    cache_dir: Optional[pathlib.Path] = None,
+    llm: Optional[Tuple[LLMClient, str]] = None,
 ) -> FlowDocument:
     schema = load_schema(schema_path)
     input_text = input_path.read_text(encoding="utf-8")
     messages = build_messages(input_text)
 
+    provider: Optional[str] = None
+    cached_client: Optional[llm_client.CachedLLMClient] = None
     if use_stub:
         client: LLMClient = DummyLLMClient(use_stub)
     else:
-        client = create_llm_client()
-
-    provider = detect_provider() if not use_stub else None
+        # llm が渡された場合は呼び出し側で生成済みのクライアントとプロバイダ名を使う
+        client, provider = llm if llm is not None else llm_client.create_llm_client()
+        if cache_dir is not None:
+            client = cached_client = llm_client.CachedLLMClient(client, cache_dir, provider=provider)
 
     raw = client.structured_flow(messages=messages, schema=schema, model=model)
     raw = normalize_flow_document(raw)
@@ -453,63 +613,82 @@ def generate_flow(
         metadata = raw.setdefault("metadata", {})
         metadata["generation"] = {"model": model, "provider": provider}
     if not skip_validation:
-        validate(raw, schema)
+        validate(raw, schema, backend=validator)
+        # 検証に通った応答だけをキャッシュし、不正な応答で再試行が塞がれないようにする
+        if cached_client is not None:
+            cached_client.commit()
     return FlowDocument(**raw)
 
 
 def save_output(document: FlowDocument, output_path: pathlib.Path) -> None:
-    output_path.write_text(json.dumps(document.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+    json_io.write_json(output_path, document.to_dict())
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate Layer1 flow JSON via LLM.")
-    parser.add_argument("--input", type=pathlib.Path, required=True, help="入力テキストファイル")
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument("--input", type=pathlib.Path, help="入力テキストファイル")
+    input_group.add_argument(
+        "--inputs-dir",
+        type=pathlib.Path,
+        help="入力ディレクトリ（配下の *.md を並行処理。--output 指定時はディレクトリとして扱う）",
+    )
     parser.add_argument("--schema", type=pathlib.Path, default=pathlib.Path("schemas/flow.schema.json"))
     parser.add_argument("--model", type=str, default="gpt-4o-mini")
     parser.add_argument("--output", type=pathlib.Path, default=None, help="出力先（省略時は runs/ 配下に自動生成）")
     parser.add_argument("--stub", type=pathlib.Path, help="LLM を呼ばずサンプル JSON を読み込む場合に指定")
     parser.add_argument("--skip-validation", action="store_true")
+    parser.add_argument(
+        "--validator",
+        choices=VALIDATOR_BACKENDS,
+        default=None,
+        help="JSON Schema 検証バックエンド（省略時は fastjsonschema があれば使用）",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=pathlib.Path,
+        default=None,
+        help="指定時のみ、検証に通ったLLMレスポンスをこのディレクトリに保存し、同一リクエストで再利用する",
+    )
     parser.add_argument("--debug", action="store_true", help="DEBUGレベルのログを出力")
     return parser.parse_args()
 
 
-def main() -> None:
-    import sys
+def _run_single(
+    args: argparse.Namespace,
+    input_path: pathlib.Path,
+    output: Optional[pathlib.Path],
+    llm: Optional[Tuple[LLMClient, str]] = None,
+) -> pathlib.Path:
+    """1件の入力ファイルからフローJSONを生成し、保存先のパスを返す。"""
     import time
     from src.utils import run_manager
 
-    args = parse_args()
-
-    # ログレベル設定
-    log_level = logging.DEBUG if args.debug else logging.INFO
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-
     start_time = time.time()
 
     # 出力先の決定
-    if args.output is None:
+    if output is None:
         # runs/構造を使用
-        run_dir = run_manager.create_run_dir(args.input)
-        run_manager.copy_input_file(args.input, run_dir)
+        run_dir = run_manager.create_run_dir(input_path)
+        input_hash = run_manager.copy_input_file(input_path, run_dir)
         output_path = run_dir / "output" / "flow.json"
         use_runs = True
     else:
         # 従来の出力先を使用
-        output_path = args.output
+        output_path = output
         run_dir = None
         use_runs = False
 
     # JSON生成
     document = generate_flow(
-        input_path=args.input,
+        input_path=input_path,
         schema_path=args.schema,
         model=args.model,
         use_stub=args.stub,
         skip_validation=args.skip_validation,
+        validator=args.validator,
+        cache_dir=args.cache_dir,
+        llm=llm,
     )
     save_output(document, output_path)
 
@@ -523,15 +702,16 @@ def main() -> None:
             "execution_id": run_dir.name,
             "execution_time": time.strftime("%Y-%m-%d %H:%M:%S"),
             "command": " ".join(sys.argv),
-            "input_file": str(args.input),
-            "input_size": args.input.stat().st_size,
-            "input_hash": run_manager._calculate_file_hash(args.input),
+            "input_file": str(input_path),
+            "input_size": input_path.stat().st_size,
+            "input_hash": input_hash,
         }
 
         # 生成設定
         if not args.stub:
             info["model"] = args.model
-            provider = detect_provider()
+            generation = (document.metadata or {}).get("generation") or {}
+            provider = generation.get("provider")
             if provider:
                 info["provider"] = provider
         info["elapsed_time"] = elapsed_time
@@ -557,6 +737,77 @@ def main() -> None:
 
         logger.info(f"実行情報を {run_dir / 'info.md'} に記録しました。")
 
+    return output_path
+
+
+def _run_batch(args: argparse.Namespace) -> int:
+    """--inputs-dir 配下の *.md を並行処理し、失敗件数を返す。
+
+    処理時間の大半は LLM API の応答待ち（I/O待ち）のため、スレッドで同時にリクエストする。
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    input_paths = sorted(args.inputs_dir.glob("*.md"))
+    if not input_paths:
+        logger.warning(f"入力ファイル(*.md)が見つかりません: {args.inputs_dir}")
+        return 0
+
+    if args.output is not None:
+        args.output.mkdir(parents=True, exist_ok=True)
+
+    # プロバイダ検出（os.environ の書き換えを含む）とクライアントのキャッシュ登録は
+    # スレッドセーフではないため、ワーカー起動前にメインスレッドで1度だけ行う
+    llm: Optional[Tuple[LLMClient, str]] = None
+    if not args.stub:
+        try:
+            llm = llm_client.create_llm_client()
+        except RuntimeError as exc:
+            logger.error(str(exc))
+            return len(input_paths)
+
+    max_workers = min(32, (os.cpu_count() or 1) * 8, len(input_paths))
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _run_single,
+                args,
+                input_path,
+                args.output / f"{input_path.stem}.json" if args.output is not None else None,
+                llm,
+            ): input_path
+            for input_path in input_paths
+        }
+        for future in as_completed(futures):
+            input_path = futures[future]
+            try:
+                future.result()
+            except Exception as exc:
+                failures += 1
+                logger.error(f"{input_path} の処理に失敗しました: {exc}")
+
+    logger.info(f"バッチ処理完了: 成功 {len(input_paths) - failures} 件 / 失敗 {failures} 件")
+    return failures
+
+
+def main() -> None:
+    args = parse_args()
+
+    # ログレベル設定
+    log_level = logging.DEBUG if args.debug else logging.INFO
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    if args.inputs_dir is not None:
+        if _run_batch(args):
+            sys.exit(1)
+        return
+
+    _run_single(args, args.input, args.output)
+
 
 if __name__ == "__main__":
     main()
@@ -9,10 +9,17 @@ This module provides:
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
 import logging
 import os
-from typing import Any, Dict, List, Optional, Protocol
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, MutableMapping, Optional, Protocol, Tuple
+
+from src.utils import json_io
 
 logger = logging.getLogger(__name__)
 
@@ -38,16 +45,27 @@ class LLMClient(Protocol):
         """Return a JSON document that satisfies the given schema."""
 
 
-def cleanup_dummy_proxies() -> None:
-    """HTTP(S)_PROXY がダミー値なら環境変数から除去する。"""
+def cleanup_dummy_proxies(env: Optional[MutableMapping[str, str]] = None) -> None:
+    """HTTP(S)_PROXY がダミー値なら環境変数から除去する。
+
+    Args:
+        env: 対象とする環境変数のマッピング（省略時は os.environ）
+    """
 
+    if env is None:
+        env = os.environ
     for key in ("HTTP_PROXY", "HTTPS_PROXY"):
-        value = os.getenv(key)
+        value = env.get(key)
         if value and is_dummy_value(value):
-            os.environ.pop(key, None)
+            env.pop(key, None)
             logger.warning(f"{key} はダミー値のため無効化しました。")
 
 
+# ダミー値に含まれるトークン（大文字小文字を区別しない）
+_DUMMY_TOKEN_RE = re.compile(r"xxx|your-", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=32)
 def is_dummy_value(value: str) -> bool:
     """ダミー値判定（XXX, your-, 10文字未満など）"""
 
@@ -58,9 +76,7 @@ def is_dummy_value(value: str) -> bool:
     if len(stripped) < 10:
         return True
 
-    lower = stripped.lower()
-    dummy_tokens = ("xxx", "your-")
-    return any(token in lower for token in dummy_tokens)
+    return _DUMMY_TOKEN_RE.search(stripped) is not None
 
 
 def validate_openai_env() -> bool:
@@ -149,17 +165,20 @@ def detect_provider() -> Optional[str]:
     return None
 
 
+# 先頭の ``` (+json) から最後の ``` までを1回のマッチで取り出す（閉じフェンスが無ければ末尾まで）
+_FENCE_RE = re.compile(r"```(?:json)?(?:(.*)```|(.*))", re.DOTALL)
+
+
 def _extract_json_payload(text: str) -> str:
     """Markdownコードブロックを除去してJSONペイロードを抽出する。"""
     stripped = text.strip()
-    if stripped.startswith("```"):
-        stripped = stripped[3:]
-        if stripped.startswith("json"):
-            stripped = stripped[4:]
-        end_idx = stripped.rfind("```")
-        if end_idx != -1:
-            stripped = stripped[:end_idx]
-    return stripped.strip()
+    match = _FENCE_RE.match(stripped)
+    if match is None:
+        return stripped
+    body = match.group(1)
+    if body is None:
+        body = match.group(2)
+    return body.strip()
 
 
 class OpenAILLMClient:
@@ -170,6 +189,11 @@ class OpenAILLMClient:
             raise ImportError("openai SDK is not installed. Run `pip install openai`.")
         self._client = OpenAI()
 
+    @property
+    def endpoint(self) -> str:
+        """リクエスト先のベースURL（応答キャッシュのキーに含める）。"""
+        return str(self._client.base_url)
+
     def structured_flow(self, *, messages: List[Dict[str, str]], schema: Dict[str, Any], model: str) -> Dict[str, Any]:
         """LLM APIを呼び出してJSON形式のフローを生成する。
 
@@ -207,7 +231,7 @@ class OpenAILLMClient:
         payload = _extract_json_payload(content)
 
         try:
-            result = json.loads(payload)
+            result = json_io.loads(payload)
             logger.debug(f"JSONパース成功: {len(payload)} bytes")
             return result
         except json.JSONDecodeError as exc:
@@ -228,6 +252,11 @@ class AzureOpenAILLMClient:
 
         self._client = AzureOpenAI(api_key=api_key, api_version=api_version, azure_endpoint=endpoint)
 
+    @property
+    def endpoint(self) -> str:
+        """リクエスト先のベースURL（応答キャッシュのキーに含める）。"""
+        return str(self._client.base_url)
+
     def structured_flow(self, *, messages: List[Dict[str, str]], schema: Dict[str, Any], model: str) -> Dict[str, Any]:
         """LLM APIを呼び出してJSON形式のフローを生成する。
 
@@ -265,7 +294,7 @@ class AzureOpenAILLMClient:
         payload = _extract_json_payload(content)
 
         try:
-            result = json.loads(payload)
+            result = json_io.loads(payload)
             logger.debug(f"JSONパース成功: {len(payload)} bytes")
             return result
         except json.JSONDecodeError as exc:
@@ -273,14 +302,84 @@ class AzureOpenAILLMClient:
             raise RuntimeError(f"JSONのパースに失敗しました。レスポンス内容: {payload[:200]}...") from exc
 
 
-def create_llm_client() -> LLMClient:
-    """detect_provider()の結果に基づきクライアント生成"""
+class CachedLLMClient:
+    """同一リクエストの応答をファイルに保存して再利用するラッパー
+
+    キーには messages / schema / model に加えてプロバイダ名と接続先を含める。
+    未キャッシュ時の応答はすぐには保存せず、呼び出し側が検証に成功した後で
+    ``commit()`` を呼んだ場合にだけ書き込む（不正な応答をキャッシュしないため）。
+    """
+
+    def __init__(self, client: LLMClient, cache_dir: Path, provider: str = "") -> None:
+        self._client = client
+        self._cache_dir = cache_dir
+        self._provider = provider
+        self._endpoint = str(getattr(client, "endpoint", ""))
+        self._pending: Optional[Tuple[Path, bytes]] = None
+
+    def _cache_path(self, messages: List[Dict[str, str]], schema: Dict[str, Any], model: str) -> Path:
+        key_source = json.dumps(
+            {
+                "messages": messages,
+                "schema": schema,
+                "model": model,
+                "provider": self._provider,
+                "endpoint": self._endpoint,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return self._cache_dir / f"{hashlib.sha256(key_source.encode('utf-8')).hexdigest()}.json"
+
+    def structured_flow(self, *, messages: List[Dict[str, str]], schema: Dict[str, Any], model: str) -> Dict[str, Any]:
+        cache_path = self._cache_path(messages, schema, model)
+        self._pending = None
+        if cache_path.exists():
+            logger.info(f"LLMレスポンスキャッシュを使用します: {cache_path}")
+            return json_io.read_json(cache_path)
+
+        result = self._client.structured_flow(messages=messages, schema=schema, model=model)
+        # 呼び出し側の正規化で書き換えられる前の応答を保持しておく
+        self._pending = (cache_path, json_io.dumps_pretty(result))
+        return result
+
+    def commit(self) -> None:
+        """直前に API から取得した応答をキャッシュに書き込む（検証成功後に呼び出す）。"""
+        if self._pending is None:
+            return
+        cache_path, payload = self._pending
+        self._pending = None
+        # 書き込み途中のファイルを読まないよう、一時ファイル経由で置き換える
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, cache_path)
+
+
+_CLIENT_CACHE: Dict[str, LLMClient] = {}
+
+
+def create_llm_client() -> Tuple[LLMClient, str]:
+    """detect_provider()の結果に基づきクライアント生成
+
+    呼び出し側で detect_provider() を再実行せずに済むよう、
+    生成したクライアントと検出したプロバイダ名の組を返す。
+    SDK クライアント（接続プール）はプロバイダごとに1度だけ生成して再利用する。
+    """
 
     provider = detect_provider()
+    cached = _CLIENT_CACHE.get(provider) if provider else None
+    if cached is not None:
+        return cached, provider
+
+    client: LLMClient
     if provider == "azure":
-        return AzureOpenAILLMClient()
-    if provider == "openai":
-        return OpenAILLMClient()
+        client = AzureOpenAILLMClient()
+    elif provider == "openai":
+        client = OpenAILLMClient()
+    else:
+        hint = "\n".join(f"- {message}" for message in _PROVIDER_ERRORS) or "- LLM プロバイダ用の環境変数が不足しています。"
+        raise RuntimeError(f"LLM プロバイダを自動検出できませんでした。\n{hint}")
 
-    hint = "\n".join(f"- {message}" for message in _PROVIDER_ERRORS) or "- LLM プロバイダ用の環境変数が不足しています。"
-    raise RuntimeError(f"LLM プロバイダを自動検出できませんでした。\n{hint}")
+    _CLIENT_CACHE[provider] = client
+    return client, provider
@@ -0,0 +1,54 @@
+"""
+JSON I/O helpers for Business-flow-maker.
+
+orjson がインストールされていれば C 実装でエンコード／デコードし、
+未インストールの場合は標準ライブラリの json にフォールバックします：
+- JSON 文字列／バイト列のパース
+- JSON ファイルの読み込み
+- インデント付き JSON ファイルの書き出し
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """JSON 文字列またはバイト列をパースする。
+
+    Raises:
+        json.JSONDecodeError: JSON として解釈できない場合（orjson の例外もこのサブクラス）
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read_json(path: Path) -> Any:
+    """UTF-8 の JSON ファイルを読み込む。
+
+    orjson はバイト列を直接パースできるため、文字列へのデコードを省略する。
+    """
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def dumps_pretty(obj: Any) -> bytes:
+    """``json.dumps(obj, ensure_ascii=False, indent=2)`` と同じ体裁の UTF-8 バイト列を返す。"""
+    if orjson is not None:
+        # OPT_NON_STR_KEYS: 標準 json と同様に int 等のキーを文字列化する
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_json(path: Path, obj: Any) -> None:
+    """インデント付き JSON を UTF-8 でファイルに書き出す。"""
+    path.write_bytes(dumps_pretty(obj))
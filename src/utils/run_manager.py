@@ -11,8 +11,10 @@ Run Manager for Business-flow-maker.
 from __future__ import annotations
 
 import hashlib
+import heapq
+import os
 import shutil
-from datetime import datetime
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -34,7 +36,7 @@ def create_run_dir(input_path: Path, base_dir: Path = Path("runs")) -> Path:
         runs/20251110_123456_sample-small-01
     """
     # タイムスタンプ生成（YYYYMMDD_HHMMSS形式）
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
 
     # 入力ファイル名（拡張子なし）を取得
     input_stem = input_path.stem
@@ -43,17 +45,14 @@ def create_run_dir(input_path: Path, base_dir: Path = Path("runs")) -> Path:
     run_dir_name = f"{timestamp}_{input_stem}"
     run_dir = base_dir / run_dir_name
 
-    # ディレクトリ作成（親ディレクトリも含む）
-    run_dir.mkdir(parents=True, exist_ok=True)
-
-    # output サブディレクトリを作成
+    # output サブディレクトリを作成（実行ディレクトリ・親ディレクトリも同時に作成される）
     output_dir = run_dir / "output"
-    output_dir.mkdir(exist_ok=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
 
     return run_dir
 
 
-def copy_input_file(src: Path, run_dir: Path) -> None:
+def copy_input_file(src: Path, run_dir: Path) -> str:
     """
     入力ファイルを実行ディレクトリにコピーする。
 
@@ -61,26 +60,76 @@ def copy_input_file(src: Path, run_dir: Path) -> None:
         src: 入力ファイルのパス
         run_dir: 実行ディレクトリのパス
 
+    Returns:
+        入力ファイルのSHA-256ハッシュ（コピーと同じ読み込みで計算）
+
     Example:
-        >>> copy_input_file(Path("samples/input/sample-small-01.md"), run_dir)
+        >>> input_hash = copy_input_file(Path("samples/input/sample-small-01.md"), run_dir)
     """
     if not src.exists():
         raise FileNotFoundError(f"入力ファイルが見つかりません: {src}")
 
-    # 入力ファイルをコピー
+    # 入力ファイルをコピー（メタデータは shutil.copy2 と同様に引き継ぐ）
     dest = run_dir / src.name
-    shutil.copy2(src, dest)
+    digest = copy_and_hash(src, dest)
+    shutil.copystat(src, dest)
+    return digest
+
+
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def copy_and_hash(src: Path, dest: Path) -> str:
+    """ファイルを1回の読み込みでコピーしつつSHA-256ハッシュを計算する。
+
+    Raises:
+        shutil.SameFileError: src と dest が同一ファイルの場合（書き込みで src を切り詰めないよう、開く前に検出する）
+    """
+    if dest.exists() and os.path.samefile(src, dest):
+        raise shutil.SameFileError(f"{src} と {dest} は同一ファイルです")
+    sha256 = hashlib.sha256()
+    buffer = bytearray(_COPY_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with src.open("rb") as fsrc, dest.open("wb") as fdest:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fsrc.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        while True:
+            n = fsrc.readinto(buffer)
+            if not n:
+                break
+            chunk = view[:n]
+            sha256.update(chunk)
+            fdest.write(chunk)
+    return sha256.hexdigest()
 
 
 def _calculate_file_hash(file_path: Path) -> str:
     """ファイルのSHA-256ハッシュを計算する。"""
-    sha256 = hashlib.sha256()
     with file_path.open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
+        if hasattr(hashlib, "file_digest"):
+            # Python 3.11+: OpenSSL 側でまとめて読み込み・ハッシュ計算する
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        sha256 = hashlib.sha256()
+        for chunk in iter(lambda: f.read(_COPY_BUFFER_SIZE), b""):
             sha256.update(chunk)
     return sha256.hexdigest()
 
 
+_INFO_TEMPLATE = (
+    "# 実行情報\n"
+    "\n"
+    "## 基本情報\n"
+    "- **実行ID**: {execution_id}\n"
+    "- **実行日時**: {execution_time}\n"
+    "- **実行コマンド**: `{command}`\n"
+    "\n"
+    "## 入力\n"
+    "- **元ファイルパス**: `{input_file}`\n"
+    "- **サイズ**: {input_size} bytes\n"
+    "- **SHA-256**: `{input_hash}`\n"
+)
+
+
 def save_info_md(run_dir: Path, info: Dict[str, Any]) -> None:
     """
     info.md を生成する。
@@ -106,41 +155,33 @@ def save_info_md(run_dir: Path, info: Dict[str, Any]) -> None:
     """
     info_path = run_dir / "info.md"
 
-    lines = ["# 実行情報", ""]
-
-    # 基本情報
-    lines.append("## 基本情報")
-    lines.append(f"- **実行ID**: {info.get('execution_id', 'N/A')}")
-    lines.append(f"- **実行日時**: {info.get('execution_time', 'N/A')}")
-    lines.append(f"- **実行コマンド**: `{info.get('command', 'N/A')}`")
-    lines.append("")
-
-    # 入力
-    lines.append("## 入力")
-    lines.append(f"- **元ファイルパス**: `{info.get('input_file', 'N/A')}`")
-    lines.append(f"- **サイズ**: {info.get('input_size', 0)} bytes")
-    lines.append(f"- **SHA-256**: `{info.get('input_hash', 'N/A')}`")
-    lines.append("")
+    # 基本情報・入力（必須セクション）
+    content = _INFO_TEMPLATE.format_map({
+        "execution_id": info.get("execution_id", "N/A"),
+        "execution_time": info.get("execution_time", "N/A"),
+        "command": info.get("command", "N/A"),
+        "input_file": info.get("input_file", "N/A"),
+        "input_size": info.get("input_size", 0),
+        "input_hash": info.get("input_hash", "N/A"),
+    })
 
     # 生成設定
     if "model" in info or "provider" in info:
-        lines.append("## 生成設定")
+        content += "\n## 生成設定\n"
         if "model" in info:
-            lines.append(f"- **LLMモデル**: {info['model']}")
+            content += f"- **LLMモデル**: {info['model']}\n"
         if "provider" in info:
-            lines.append(f"- **プロバイダ**: {info['provider']}")
+            content += f"- **プロバイダ**: {info['provider']}\n"
         if "elapsed_time" in info:
-            lines.append(f"- **実行時間**: {info['elapsed_time']:.2f}秒")
-        lines.append("")
+            content += f"- **実行時間**: {info['elapsed_time']:.2f}秒\n"
 
     # 出力ファイル
     if "output_files" in info:
-        lines.append("## 出力ファイル")
-        for file_info in info["output_files"]:
-            lines.append(f"- `{file_info['path']}` ({file_info['size']} bytes)")
-        lines.append("")
+        content += "\n## 出力ファイル\n" + "".join(
+            f"- `{file_info['path']}` ({file_info['size']} bytes)\n" for file_info in info["output_files"]
+        )
 
-    info_path.write_text("\n".join(lines), encoding="utf-8")
+    info_path.write_text(content, encoding="utf-8")
 
 
 def update_info_md(run_dir: Path, updates: Dict[str, Any]) -> None:
@@ -174,9 +215,8 @@ def update_info_md(run_dir: Path, updates: Dict[str, Any]) -> None:
     if not info_path.exists():
         raise FileNotFoundError(f"info.md が見つかりません: {info_path}")
 
-    # 既存の内容を読み込む
-    existing_content = info_path.read_text(encoding="utf-8")
-    lines = [existing_content]
+    # 追記分だけを組み立て、既存の内容は読み直さずに末尾へ追加する
+    lines: List[str] = []
 
     # JSON検証結果
     if "json_validation" in updates:
@@ -202,7 +242,19 @@ def update_info_md(run_dir: Path, updates: Dict[str, Any]) -> None:
             status = "✓" if item["status"] == "OK" else "✗"
             lines.append(f"- [{status}] {item['label']}")
 
-    info_path.write_text("\n".join(lines), encoding="utf-8")
+    if not lines:
+        return
+    with info_path.open("a", encoding="utf-8") as f:
+        f.write("\n" + "\n".join(lines))
+
+
+def _run_dir_names(base_dir: Path) -> List[str]:
+    """実行ディレクトリ名の一覧を返す（ドットで始まるキャッシュ等は除外）。
+
+    os.scandir の DirEntry は種別情報を保持しているため、追加の stat を発行しない。
+    """
+    with os.scandir(base_dir) as entries:
+        return [entry.name for entry in entries if entry.is_dir() and not entry.name.startswith(".")]
 
 
 def get_latest_run(base_dir: Path = Path("runs")) -> Optional[Path]:
@@ -223,14 +275,9 @@ def get_latest_run(base_dir: Path = Path("runs")) -> Optional[Path]:
     if not base_dir.exists():
         return None
 
-    # タイムスタンプでソート（降順）
-    run_dirs = sorted(
-        [d for d in base_dir.iterdir() if d.is_dir()],
-        key=lambda d: d.name,
-        reverse=True
-    )
-
-    return run_dirs[0] if run_dirs else None
+    # ディレクトリ名はタイムスタンプ始まりのため、名前の最大値が最新
+    latest = max(_run_dir_names(base_dir), default=None)
+    return base_dir / latest if latest is not None else None
 
 
 def list_runs(base_dir: Path = Path("runs"), limit: int = 10) -> List[Path]:
@@ -239,7 +286,7 @@ def list_runs(base_dir: Path = Path("runs"), limit: int = 10) -> List[Path]:
 
     Args:
         base_dir: 実行履歴を格納する基底ディレクトリ（デフォルト: runs/）
-        limit: 取得する最大件数（デフォルト: 10）
+        limit: 取得する最大件数（デフォルト: 10）。0 以下はリストのスライスと同じ扱い
 
     Returns:
         実行ディレクトリのパスのリスト
@@ -254,11 +301,9 @@ def list_runs(base_dir: Path = Path("runs"), limit: int = 10) -> List[Path]:
     if not base_dir.exists():
         return []
 
-    # タイムスタンプでソート（降順）
-    run_dirs = sorted(
-        [d for d in base_dir.iterdir() if d.is_dir()],
-        key=lambda d: d.name,
-        reverse=True
-    )
-
-    return run_dirs[:limit]
+    names = _run_dir_names(base_dir)
+    if limit <= 0:
+        # 0 以下はスライス（run_dirs[:limit]）と同じ意味を保つ（例: -1 なら最古の1件以外）
+        return [base_dir / name for name in sorted(names, reverse=True)[:limit]]
+    # タイムスタンプ降順で上位 limit 件のみ取り出す（全件ソートしない）
+    return [base_dir / name for name in heapq.nlargest(limit, names)]
@@ -5,12 +5,15 @@ Layer1 flow visualization and review exporter.
 from __future__ import annotations
 
 import argparse
-import json
+import functools
 import logging
+import re
+import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
-from xml.etree.ElementTree import Element, SubElement, tostring
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from src.utils import json_io
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +29,13 @@ MARGIN_Y = 40
 UTF8_WITH_BOM = "utf-8-sig"
 SVG_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
 
+# slots=True は Python 3.10 以降のみ対応（3.9 では __dict__ を持つ通常の dataclass）
+_NODE_LAYOUT_OPTIONS: Dict[str, Any] = {"frozen": True}
+if sys.version_info >= (3, 10):
+    _NODE_LAYOUT_OPTIONS["slots"] = True
+
 
-@dataclass
+@dataclass(**_NODE_LAYOUT_OPTIONS)
 class NodeLayout:
     node_id: str
     label: str
@@ -39,7 +47,7 @@ class NodeLayout:
 
 
 def load_flow(path: Path) -> Dict[str, Any]:
-    return json.loads(path.read_text(encoding="utf-8"))
+    return json_io.read_json(path)
 
 
 def determine_orders(flow: Dict[str, Any]) -> Tuple[Dict[str, int], Dict[str, int]]:
@@ -48,67 +56,104 @@ def determine_orders(flow: Dict[str, Any]) -> Tuple[Dict[str, int], Dict[str, in
     return actor_order, phase_order
 
 
-def infer_phase_idx(node_id: str, flow: Dict[str, Any], phase_order: Dict[str, int]) -> int:
-    for task in flow.get("tasks", []):
-        if task["id"] == node_id:
-            return phase_order.get(task.get("phase_id", ""), 0)
+def _first_neighbours(flow: Dict[str, Any]) -> Dict[str, str]:
+    """各ノードについて、flows の出現順で最初に接続している相手ノードを返す。"""
+    neighbours: Dict[str, str] = {}
     for link in flow.get("flows", []):
-        if link["from"] == node_id:
-            return infer_phase_idx(link["to"], flow, phase_order)
-        if link["to"] == node_id:
-            return infer_phase_idx(link["from"], flow, phase_order)
-    return 0
+        neighbours.setdefault(link["from"], link["to"])
+        neighbours.setdefault(link["to"], link["from"])
+    return neighbours
+
+
+def resolve_lane_indices(
+    flow: Dict[str, Any],
+    actor_order: Dict[str, int],
+    phase_order: Dict[str, int],
+) -> Dict[str, Tuple[int, int]]:
+    """タスク以外のノード（ゲートウェイ等）の (actor_idx, phase_idx) をまとめて求める。
+
+    タスクでないノードは flows 上で最初に接続しているノードを辿り、到達したタスクの
+    レーン・フェーズを引き継ぐ。辿った経路は結果を共有するため、各ノードは1回だけ訪問する。
+    接続が無い場合や循環している場合は (0, 0) とする。
+    """
+    resolved: Dict[str, Tuple[int, int]] = {}
+    for task in flow.get("tasks", []):
+        resolved.setdefault(
+            task["id"],
+            (actor_order.get(task.get("actor_id", ""), 0), phase_order.get(task.get("phase_id", ""), 0)),
+        )
+    neighbours = _first_neighbours(flow)
+
+    def resolve(node_id: str) -> Tuple[int, int]:
+        path: List[str] = []
+        on_path = set()
+        current: Optional[str] = node_id
+        while current is not None and current not in resolved and current not in on_path:
+            path.append(current)
+            on_path.add(current)
+            current = neighbours.get(current)
+        result = resolved.get(current, (0, 0)) if current is not None else (0, 0)
+        for visited in path:
+            resolved[visited] = result
+        return result
+
+    for node_id in list(neighbours):
+        resolve(node_id)
+    return resolved
+
+
+def infer_phase_idx(node_id: str, flow: Dict[str, Any], phase_order: Dict[str, int]) -> int:
+    actor_order, _ = determine_orders(flow)
+    return resolve_lane_indices(flow, actor_order, phase_order).get(node_id, (0, 0))[1]
 
 
 def infer_actor_idx(node_id: str, flow: Dict[str, Any], actor_order: Dict[str, int]) -> int:
-    for task in flow.get("tasks", []):
-        if task["id"] == node_id:
-            return actor_order.get(task.get("actor_id", ""), 0)
-    neighbour_ids: List[str] = []
-    for link in flow.get("flows", []):
-        if link["from"] == node_id:
-            neighbour_ids.append(link["to"])
-        elif link["to"] == node_id:
-            neighbour_ids.append(link["from"])
-    for neighbour in neighbour_ids:
-        idx = infer_actor_idx(neighbour, flow, actor_order)
-        if idx is not None:
-            return idx
-    return 0
-
-
-def build_layout(flow: Dict[str, Any]) -> Dict[str, NodeLayout]:
-    actor_order, phase_order = determine_orders(flow)
+    _, phase_order = determine_orders(flow)
+    return resolve_lane_indices(flow, actor_order, phase_order).get(node_id, (0, 0))[0]
+
+
+def build_layout(
+    flow: Dict[str, Any],
+    actor_order: Optional[Dict[str, int]] = None,
+    phase_order: Optional[Dict[str, int]] = None,
+) -> Dict[str, NodeLayout]:
+    if actor_order is None or phase_order is None:
+        actor_order, phase_order = determine_orders(flow)
+    lane_indices = resolve_lane_indices(flow, actor_order, phase_order)
     positions: Dict[str, NodeLayout] = {}
 
+    tasks = flow.get("tasks", [])
+
     # First pass: Count tasks per (actor_id, phase_id) combination
     group_counts: Dict[Tuple[str, str], int] = {}
-    for task in flow.get("tasks", []):
+    for task in tasks:
         group_key = (task.get("actor_id", ""), task.get("phase_id", ""))
         group_counts[group_key] = group_counts.get(group_key, 0) + 1
 
-    # Second pass: Assign positions with vertical offset to avoid overlapping
-    task_counters: Dict[Tuple[str, str], int] = {}
-    for task in flow.get("tasks", []):
-        actor_id = task.get("actor_id", "")
-        phase_id = task.get("phase_id", "")
+    # グループ内で共通の座標要素は (actor, phase) ごとに一度だけ計算する
+    group_bases: Dict[Tuple[str, str], Tuple[int, int, float, float, float]] = {}
+    for group_key, total_tasks in group_counts.items():
+        actor_id, phase_id = group_key
         actor_idx = actor_order.get(actor_id, 0)
         phase_idx = phase_order.get(phase_id, 0)
+        lane_top = MARGIN_Y + actor_idx * LANE_HEIGHT
+        x = MARGIN_X + LANE_HEADER_WIDTH + phase_idx * (TASK_WIDTH + COLUMN_GAP)
+        # Center the group of tasks vertically within the lane
+        y_base = lane_top + (LANE_HEIGHT - TASK_HEIGHT) / 2
+        y_center_adjustment = (total_tasks - 1) * (TASK_HEIGHT + 10) / 2
+        group_bases[group_key] = (actor_idx, phase_idx, x, y_base, y_center_adjustment)
+
+    # Second pass: Assign positions with vertical offset to avoid overlapping
+    task_counters: Dict[Tuple[str, str], int] = {}
+    for task in tasks:
+        group_key = (task.get("actor_id", ""), task.get("phase_id", ""))
+        actor_idx, phase_idx, x, y_base, y_center_adjustment = group_bases[group_key]
 
         # Get task order within this (actor, phase) group
-        group_key = (actor_id, phase_id)
         task_order = task_counters.get(group_key, 0)
         task_counters[group_key] = task_order + 1
-        total_tasks = group_counts[group_key]
 
-        lane_top = MARGIN_Y + actor_idx * LANE_HEIGHT
-        x = MARGIN_X + LANE_HEADER_WIDTH + phase_idx * (TASK_WIDTH + COLUMN_GAP)
-
-        # Calculate Y position with vertical offset
-        # Center the group of tasks vertically within the lane
-        y_base = lane_top + (LANE_HEIGHT - TASK_HEIGHT) / 2
         y_offset = task_order * (TASK_HEIGHT + 10)  # 10px gap between tasks
-        y_center_adjustment = (total_tasks - 1) * (TASK_HEIGHT + 10) / 2
         y = y_base + y_offset - y_center_adjustment
 
         positions[task["id"]] = NodeLayout(
@@ -123,8 +168,7 @@ def build_layout(flow: Dict[str, Any]) -> Dict[str, NodeLayout]:
 
     for gateway in flow.get("gateways", []):
         node_id = gateway["id"]
-        actor_idx = infer_actor_idx(node_id, flow, actor_order)
-        phase_idx = infer_phase_idx(node_id, flow, phase_order)
+        actor_idx, phase_idx = lane_indices.get(node_id, (0, 0))
         lane_top = MARGIN_Y + actor_idx * LANE_HEIGHT
         x = MARGIN_X + LANE_HEADER_WIDTH + phase_idx * (TASK_WIDTH + COLUMN_GAP) + TASK_WIDTH / 2
         y = lane_top + LANE_HEIGHT / 2
@@ -151,129 +195,144 @@ def svg_size(flow: Dict[str, Any]) -> Tuple[int, int]:
     return int(width), int(height)
 
 
-def build_svg(flow: Dict[str, Any]) -> str:
+_ATTR_ESCAPES = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "\r": "&#13;",
+    "\n": "&#10;",
+    "\t": "&#09;",
+})
+_TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+# 大半のラベル・属性値はエスケープ対象を含まないため、検索で当たった場合のみ translate する
+_ATTR_NEEDS_ESCAPE = re.compile('[&<>"\r\n\t]')
+_TEXT_NEEDS_ESCAPE = re.compile("[&<>]")
+
+_FONT_FAMILY = "Segoe UI, sans-serif"
+
+# 入力に依存しない定型部分（矢印マーカー定義）
+_SVG_DEFS = (
+    '<defs><marker id="arrow" markerWidth="10" markerHeight="10" refX="10" refY="3" orient="auto">'
+    '<path d="M0,0 L10,3 L0,6 Z" fill="#555" /></marker></defs>'
+)
+
+
+@functools.lru_cache(maxsize=2048)
+def _escape_text(text: str) -> str:
+    # アクター名や「はい/いいえ」等の条件ラベルは繰り返し出現するためキャッシュする
+    if _TEXT_NEEDS_ESCAPE.search(text):
+        return text.translate(_TEXT_ESCAPES)
+    return text
+
+
+def _escape_attr(value: Any) -> str:
+    text = str(value)
+    if _ATTR_NEEDS_ESCAPE.search(text):
+        return text.translate(_ATTR_ESCAPES)
+    return text
+
+
+def _attr_markup(attrs: Dict[str, Any]) -> str:
+    return "".join(f' {name}="{_escape_attr(value)}"' for name, value in attrs.items())
+
+
+def _element(tag: str, attrs: Dict[str, Any], text: Optional[str] = None, fixed_attrs: str = "") -> str:
+    """SVG 要素1つ分のマークアップを返す（ElementTree.tostring と同じ書式）。
+
+    fixed_attrs には要素種別ごとに共通な属性を事前に整形したものを渡し、attrs の後ろに出力する。
+    """
+    attr_markup = _attr_markup(attrs) + fixed_attrs
+    if text:
+        return f"<{tag}{attr_markup}>{_escape_text(text)}</{tag}>"
+    return f"<{tag}{attr_markup} />"
+
+
+# 要素種別ごとに値が変わらない属性（モジュール読み込み時に一度だけ整形する）
+_LANE_RECT_ATTRS = _attr_markup({"stroke": "#d0d0d0"})
+_LANE_LABEL_ATTRS = _attr_markup({"font-size": "16", "font-family": _FONT_FAMILY})
+_PHASE_LABEL_ATTRS = _attr_markup({"font-size": "14", "font-family": _FONT_FAMILY, "text-anchor": "middle"})
+_TASK_RECT_ATTRS = _attr_markup({
+    "width": TASK_WIDTH,
+    "height": TASK_HEIGHT,
+    "rx": "6",
+    "ry": "6",
+    "fill": "#ffffff",
+    "stroke": "#555555",
+})
+_TASK_LABEL_ATTRS = _attr_markup({"font-size": "13", "font-family": _FONT_FAMILY, "text-anchor": "middle"})
+_GATEWAY_SHAPE_ATTRS = _attr_markup({"fill": "#fff4e6", "stroke": "#d17a22", "stroke-width": "2"})
+_GATEWAY_LABEL_ATTRS = _attr_markup({"font-size": "12", "font-family": _FONT_FAMILY, "text-anchor": "middle"})
+_FLOW_LINE_ATTRS = _attr_markup({"stroke": "#555", "stroke-width": "2", "marker-end": "url(#arrow)"})
+_CONDITION_LABEL_ATTRS = _attr_markup({
+    "font-size": "11",
+    "font-family": _FONT_FAMILY,
+    "text-anchor": "middle",
+    "fill": "#444",
+})
+
+
+def iter_svg(flow: Dict[str, Any]) -> Iterator[str]:
+    """SVG マークアップを要素単位の断片として順に返す。"""
     actor_order, phase_order = determine_orders(flow)
-    layout = build_layout(flow)
+    layout = build_layout(flow, actor_order, phase_order)
     width, height = svg_size(flow)
 
-    svg = Element(
-        "svg",
-        attrib={
-            "xmlns": "http://www.w3.org/2000/svg",
-            "viewBox": f"0 0 {width} {height}",
-            "width": str(width),
-            "height": str(height),
-        },
-    )
-
-    defs = SubElement(svg, "defs")
-    marker = SubElement(
-        defs,
-        "marker",
-        attrib={"id": "arrow", "markerWidth": "10", "markerHeight": "10", "refX": "10", "refY": "3", "orient": "auto"},
-    )
-    SubElement(marker, "path", attrib={"d": "M0,0 L10,3 L0,6 Z", "fill": "#555"})
+    # 出力専用のマークアップなので、要素ツリーを作らず文字列断片を直接生成する
+    yield f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" width="{width}" height="{height}">'
+    yield _SVG_DEFS
 
     # Swimlanes
     for actor in flow.get("actors", []):
-        idx = actor_order.get(actor["id"], 0)
+        idx = actor_order[actor["id"]]
         y = MARGIN_Y + idx * LANE_HEIGHT
-        SubElement(
-            svg,
-            "rect",
-            attrib={
-                "x": str(MARGIN_X),
-                "y": str(y),
-                "width": str(width - 2 * MARGIN_X),
-                "height": str(LANE_HEIGHT),
-                "fill": "#f8f8f8" if idx % 2 == 0 else "#f0f0f0",
-                "stroke": "#d0d0d0",
-            },
-        )
-        SubElement(
-            svg,
-            "text",
-            attrib={
-                "x": str(MARGIN_X + 10),
-                "y": str(y + 30),
-                "font-size": "16",
-                "font-family": "Segoe UI, sans-serif",
-            },
-        ).text = actor.get("name", actor["id"])
+        yield _element("rect", {
+            "x": MARGIN_X,
+            "y": y,
+            "width": width - 2 * MARGIN_X,
+            "height": LANE_HEIGHT,
+            "fill": "#f8f8f8" if idx % 2 == 0 else "#f0f0f0",
+        }, fixed_attrs=_LANE_RECT_ATTRS)
+        yield _element("text", {
+            "x": MARGIN_X + 10,
+            "y": y + 30,
+        }, actor.get("name", actor["id"]), _LANE_LABEL_ATTRS)
 
     # Phases header
     for phase in flow.get("phases", []):
-        idx = phase_order.get(phase["id"], 0)
+        idx = phase_order[phase["id"]]
         x = MARGIN_X + LANE_HEADER_WIDTH + idx * (TASK_WIDTH + COLUMN_GAP)
-        SubElement(
-            svg,
-            "text",
-            attrib={
-                "x": str(x + TASK_WIDTH / 2),
-                "y": str(MARGIN_Y - 10),
-                "font-size": "14",
-                "font-family": "Segoe UI, sans-serif",
-                "text-anchor": "middle",
-            },
-        ).text = phase.get("name", phase["id"])
+        yield _element("text", {
+            "x": x + TASK_WIDTH / 2,
+            "y": MARGIN_Y - 10,
+        }, phase.get("name", phase["id"]), _PHASE_LABEL_ATTRS)
 
     # Tasks and gateways
     for node in layout.values():
+        # 描画に使う座標とラベルはノードごとに一度だけ取り出す
+        x, y, label = node.x, node.y, node.label
         if node.kind == "task":
-            SubElement(
-                svg,
-                "rect",
-                attrib={
-                    "x": str(node.x),
-                    "y": str(node.y),
-                    "width": str(TASK_WIDTH),
-                    "height": str(TASK_HEIGHT),
-                    "rx": "6",
-                    "ry": "6",
-                    "fill": "#ffffff",
-                    "stroke": "#555555",
-                },
-            )
-            SubElement(
-                svg,
-                "text",
-                attrib={
-                    "x": str(node.x + TASK_WIDTH / 2),
-                    "y": str(node.y + TASK_HEIGHT / 2 + 5),
-                    "font-size": "13",
-                    "font-family": "Segoe UI, sans-serif",
-                    "text-anchor": "middle",
-                },
-            ).text = node.label
+            yield _element("rect", {"x": x, "y": y}, fixed_attrs=_TASK_RECT_ATTRS)
+            yield _element("text", {
+                "x": x + TASK_WIDTH / 2,
+                "y": y + TASK_HEIGHT / 2 + 5,
+            }, label, _TASK_LABEL_ATTRS)
         else:
             size = TASK_HEIGHT * 0.6
             points = [
-                (node.x, node.y - size / 2),
-                (node.x + size / 2, node.y),
-                (node.x, node.y + size / 2),
-                (node.x - size / 2, node.y),
+                (x, y - size / 2),
+                (x + size / 2, y),
+                (x, y + size / 2),
+                (x - size / 2, y),
             ]
-            SubElement(
-                svg,
-                "polygon",
-                attrib={
-                    "points": " ".join(f"{x},{y}" for x, y in points),
-                    "fill": "#fff4e6",
-                    "stroke": "#d17a22",
-                    "stroke-width": "2",
-                },
-            )
-            SubElement(
-                svg,
-                "text",
-                attrib={
-                    "x": str(node.x),
-                    "y": str(node.y + 5),
-                    "font-size": "12",
-                    "font-family": "Segoe UI, sans-serif",
-                    "text-anchor": "middle",
-                },
-            ).text = node.label or node.node_id
+            yield _element("polygon", {
+                "points": " ".join(f"{px},{py}" for px, py in points),
+            }, fixed_attrs=_GATEWAY_SHAPE_ATTRS)
+            yield _element("text", {
+                "x": x,
+                "y": y + 5,
+            }, label or node.node_id, _GATEWAY_LABEL_ATTRS)
 
     # Flows
     for link in flow.get("flows", []):
@@ -287,48 +346,33 @@ def build_svg(flow: Dict[str, Any]) -> str:
                 missing_ids.append(f"to={link['to']}")
             logger.warning(f"flow {link.get('id', 'unknown')} の参照エラー: {', '.join(missing_ids)} が存在しません。このflowをスキップします。")
             continue
-        SubElement(
-            svg,
-            "line",
-            attrib={
-                "x1": str(start.x + TASK_WIDTH),
-                "y1": str(start.y + TASK_HEIGHT / 2),
-                "x2": str(end.x),
-                "y2": str(end.y + (0 if end.kind == "gateway" else TASK_HEIGHT / 2)),
-                "stroke": "#555",
-                "stroke-width": "2",
-                "marker-end": "url(#arrow)",
-            },
-        )
+        yield _element("line", {
+            "x1": start.x + TASK_WIDTH,
+            "y1": start.y + TASK_HEIGHT / 2,
+            "x2": end.x,
+            "y2": end.y + (0 if end.kind == "gateway" else TASK_HEIGHT / 2),
+        }, fixed_attrs=_FLOW_LINE_ATTRS)
         if link.get("condition"):
             label_x = (start.x + end.x) / 2
             label_y = (start.y + end.y) / 2
-            SubElement(
-                svg,
-                "text",
-                attrib={
-                    "x": str(label_x),
-                    "y": str(label_y - 4),
-                    "font-size": "11",
-                    "font-family": "Segoe UI, sans-serif",
-                    "text-anchor": "middle",
-                    "fill": "#444",
-                },
-            ).text = link["condition"]
-
-    return tostring(svg, encoding="unicode")
+            yield _element("text", {
+                "x": label_x,
+                "y": label_y - 4,
+            }, link["condition"], _CONDITION_LABEL_ATTRS)
 
+    yield "</svg>"
 
-def build_html(flow: Dict[str, Any], svg: str) -> str:
-    metadata = flow.get("metadata", {})
-    issues = flow.get("issues", [])
-    actors = flow.get("actors", [])
-    phases = flow.get("phases", [])
-    html = f"""<!DOCTYPE html>
+
+def build_svg(flow: Dict[str, Any]) -> str:
+    return "".join(iter_svg(flow))
+
+
+# HTML プレビューの定型部分（SVG の埋め込み位置で前半・後半に分割）
+_HTML_HEAD_TEMPLATE = """<!DOCTYPE html>
 <html lang="ja">
 <head>
   <meta charset="utf-8" />
-  <title>{metadata.get("title", "Flow preview")}</title>
+  <title>{title}</title>
   <style>
     body {{ font-family: "Segoe UI", sans-serif; margin: 24px; background-color: #fafafa; }}
     .panel {{ background: #fff; border-radius: 8px; padding: 16px; box-shadow: 0 2px 6px rgba(0,0,0,0.08); margin-bottom: 24px; }}
@@ -340,41 +384,78 @@ def build_html(flow: Dict[str, Any], svg: str) -> str:
 </head>
 <body>
   <div class="panel">
-    <h1>{metadata.get("title", "Flow preview")}</h1>
-    <p>ID: {metadata.get("id", "-")} / Source: {metadata.get("source", "-")} / Last updated: {metadata.get("last_updated", "-")}</p>
+    <h1>{title}</h1>
+    <p>ID: {id} / Source: {source} / Last updated: {last_updated}</p>
   </div>
   <div class="panel">
     <h2>Swimlane view</h2>
-    {svg}
+    """
+
+_HTML_TAIL_TEMPLATE = """
   </div>
   <div class="panel">
     <h2>概要</h2>
-    <p>Actors: {len(actors)} / Phases: {len(phases)} / Tasks: {len(flow.get("tasks", []))} / Gateways: {len(flow.get("gateways", []))}</p>
+    <p>Actors: {actor_count} / Phases: {phase_count} / Tasks: {task_count} / Gateways: {gateway_count}</p>
     <h3>Issues</h3>
     <ul>
-      {''.join(f'<li>{issue.get("note","")}</li>' for issue in issues) or '<li>issues 未登録</li>'}
+      {issue_items}
     </ul>
   </div>
 </body>
 </html>
 """
-    return html
 
 
+def html_frame(flow: Dict[str, Any]) -> Tuple[str, str]:
+    """SVG を埋め込む位置で分割した HTML の前半・後半を返す。"""
+    metadata = flow.get("metadata", {})
+    issues = flow.get("issues", [])
+    title = metadata.get("title", "Flow preview")
+    head = _HTML_HEAD_TEMPLATE.format_map({
+        "title": title,
+        "id": metadata.get("id", "-"),
+        "source": metadata.get("source", "-"),
+        "last_updated": metadata.get("last_updated", "-"),
+    })
+    tail = _HTML_TAIL_TEMPLATE.format_map({
+        "actor_count": len(flow.get("actors", [])),
+        "phase_count": len(flow.get("phases", [])),
+        "task_count": len(flow.get("tasks", [])),
+        "gateway_count": len(flow.get("gateways", [])),
+        "issue_items": "".join(f'<li>{issue.get("note", "")}</li>' for issue in issues) or "<li>issues 未登録</li>",
+    })
+    return head, tail
 
 
-def save_text(path: Path, content: str) -> None:
+def build_html(flow: Dict[str, Any], svg: str) -> str:
+    head, tail = html_frame(flow)
+    return f"{head}{svg}{tail}"
+
+
+def open_text(path: Path) -> TextIO:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding=UTF8_WITH_BOM)
+    return path.open("w", encoding=UTF8_WITH_BOM, buffering=1 << 16)
+
+
+def save_text(path: Path, content: str) -> None:
+    with open_text(path) as f:
+        f.write(content)
 
 
-def run_export(flow_path: Path, html_path: Path, svg_path: Path) -> None:
+def run_export(flow_path: Path, html_path: Path, svg_path: Path) -> Dict[str, Any]:
+    """flow JSON から SVG / HTML を書き出し、読み込んだ flow を返す。"""
     flow = load_flow(flow_path)
-    svg_markup = build_svg(flow)
-    svg_file_markup = f"{SVG_XML_DECLARATION}{svg_markup}"
-    html = build_html(flow, svg_markup)
-    save_text(svg_path, svg_file_markup)
-    save_text(html_path, html)
+    # SVG 全体やHTML全体を1つの文字列に連結せず、断片のままファイルへ書き出す
+    svg_parts = list(iter_svg(flow))
+    html_head, html_tail = html_frame(flow)
+    with open_text(svg_path) as f:
+        f.write(SVG_XML_DECLARATION)
+        f.writelines(svg_parts)
+    with open_text(html_path) as f:
+        f.write(html_head)
+        f.writelines(svg_parts)
+        f.write(html_tail)
+    return flow
 
 
 def parse_args() -> argparse.Namespace:
@@ -389,7 +470,7 @@ def main() -> None:
     from src.utils import run_manager
 
     args = parse_args()
-    run_export(args.json, args.html, args.svg)
+    flow = run_export(args.json, args.html, args.svg)
     print("[export] flow.html / flow.svg を生成しました。")
 
     # runs/構造を検出し、info.mdを更新
@@ -412,15 +493,19 @@ def main() -> None:
                 {"path": str(svg_abs.relative_to(run_dir_abs)), "size": svg_abs.stat().st_size},
             ]
 
-            # レビューチェックリストを作成
-            flow = load_flow(args.json)
+            # レビューチェックリストを作成（run_export で読み込んだ flow を再利用）
+            # flows が参照するノード ID は 1 パスで集めておき、gateway ごとの再構築を避ける
+            referenced_ids = set()
+            for link in flow.get("flows", []):
+                referenced_ids.add(link.get("from"))
+                referenced_ids.add(link.get("to"))
             checklist = [
                 {"label": "actors/phases/tasks/flows/issues をすべて保持している",
                  "status": "OK" if all(len(flow.get(key, [])) > 0 for key in ["actors", "phases", "tasks", "flows", "issues"]) else "NG"},
                 {"label": "issues に曖昧点や未決事項が列挙されている",
                  "status": "OK" if len(flow.get("issues", [])) > 0 else "NG"},
                 {"label": "gateway を含む場合は flows で参照漏れがない",
-                 "status": "OK" if all(gw["id"] in {link.get("from") for link in flow.get("flows", [])} | {link.get("to") for link in flow.get("flows", [])} for gw in flow.get("gateways", [])) else "NG"},
+                 "status": "OK" if all(gw["id"] in referenced_ids for gw in flow.get("gateways", [])) else "NG"},
                 {"label": "tasks の handoff_to が必ず存在する",
                  "status": "OK" if all("handoff_to" in task for task in flow.get("tasks", [])) else "NG"},
             ]
@@ -7,22 +7,29 @@ This module converts flow.json to Mermaid flowchart (TD format) with markdown co
 from __future__ import annotations
 
 import argparse
-import json
+import functools
 import pathlib
+from operator import itemgetter
 from typing import Any, Dict, List
 
+from src.utils import json_io
 
+# ダブルクォートをシングルクォートに、改行を空白に置換する変換表
+_SANITIZE_TABLE = str.maketrans({'"': "'", "\n": " ", "\r": " "})
+
+# タスクから (id, name) を取り出す
+_ID_AND_NAME = itemgetter("id", "name")
+
+
+@functools.lru_cache(maxsize=1024)
 def sanitize_label(text: str) -> str:
     """
     Mermaidのラベルとして安全な文字列に変換する。
 
     ダブルクォートやその他の特殊文字をエスケープまたは除去する。
     """
-    # ダブルクォートをシングルクォートに置換
-    text = text.replace('"', "'")
-    # 改行を空白に置換
-    text = text.replace("\n", " ").replace("\r", " ")
-    return text.strip()
+    # 置換は 1 回の translate でまとめて行う
+    return text.translate(_SANITIZE_TABLE).strip()
 
 
 def generate_mermaid(flow_data: Dict[str, Any]) -> str:
@@ -35,56 +42,45 @@ def generate_mermaid(flow_data: Dict[str, Any]) -> str:
     Returns:
         Mermaid flowchart TD 形式の文字列（markdownコードブロック付き）
     """
-    lines: List[str] = []
-    lines.append("```mermaid")
-    lines.append("flowchart TD")
-    lines.append("")
+    lines: List[str] = ["```mermaid", "flowchart TD", ""]
+    append = lines.append
+    label = sanitize_label
 
-    # タスクノードを定義
+    # タスクノードを定義（角丸四角形）
     tasks = flow_data.get("tasks", [])
-    for task in tasks:
-        task_id = task["id"]
-        task_name = sanitize_label(task["name"])
-        # 角丸四角形でタスクを表現
-        lines.append(f'    {task_id}["{task_name}"]')
+    for task_id, task_name in map(_ID_AND_NAME, tasks):
+        append(f'    {task_id}["{label(task_name)}"]')
 
     # ゲートウェイノードを定義（ひし形）
     # フローに接続されているゲートウェイのみ定義（孤立ゲートウェイを除外）
     flows = flow_data.get("flows", [])
     gateway_ids_in_flows = set()
+    add = gateway_ids_in_flows.add
     for flow in flows:
-        gateway_ids_in_flows.add(flow.get("from", ""))
-        gateway_ids_in_flows.add(flow.get("to", ""))
+        add(flow.get("from", ""))
+        add(flow.get("to", ""))
 
     gateways = flow_data.get("gateways", [])
     for gateway in gateways:
         gw_id = gateway["id"]
-        # フローに接続されているゲートウェイのみ定義
+        # name は出力対象のゲートウェイでのみ参照する（孤立ゲートウェイは name 欠落を許容）
         if gw_id in gateway_ids_in_flows:
-            gw_name = sanitize_label(gateway["name"])
-            # ひし形でゲートウェイを表現
-            lines.append(f'    {gw_id}{{"{gw_name}"}}')
+            append(f'    {gw_id}{{"{label(gateway["name"])}"}}')
 
     if tasks or gateways:
-        lines.append("")
+        append("")
 
-    # フローを定義
-    flows = flow_data.get("flows", [])
+    # フローを定義（条件付きフローはラベル付き矢印）
     for flow in flows:
         from_id = flow.get("from", "")
         to_id = flow.get("to", "")
-        condition = flow.get("condition")
-
         if not from_id or not to_id:
             continue
-
+        condition = flow.get("condition")
         if condition:
-            # 条件付きフロー（ラベル付き矢印）
-            condition_label = sanitize_label(condition)
-            lines.append(f'    {from_id} -->|"{condition_label}"| {to_id}')
+            append(f'    {from_id} -->|"{label(condition)}"| {to_id}')
         else:
-            # 通常のフロー
-            lines.append(f'    {from_id} --> {to_id}')
+            append(f"    {from_id} --> {to_id}")
 
     lines.append("```")
     return "\n".join(lines)
@@ -100,7 +96,7 @@ def load_flow_json(json_path: pathlib.Path) -> Dict[str, Any]:
     Returns:
         JSONデータ（dict形式）
     """
-    return json.loads(json_path.read_text(encoding="utf-8"))
+    return json_io.read_json(json_path)
 
 
 def save_mermaid(mermaid_text: str, output_path: pathlib.Path) -> None:
@@ -10,6 +10,8 @@ from typing import Dict, Iterator, Tuple
 
 import pytest
 
+from src.utils import json_io
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 SCHEMA_PATH = PROJECT_ROOT / "schemas" / "flow.schema.json"
 LLM_RAW_SAMPLE_PATH = PROJECT_ROOT / "tests" / "data" / "llm_raw_sample.json"
@@ -43,6 +45,15 @@ def schema_path() -> Path:
     return SCHEMA_PATH
 
 
+@pytest.fixture(scope="session")
+def expected_flows() -> Dict[str, Dict[str, object]]:
+    """サンプルの期待値 JSON をセッション中に一度だけ読み込む（テスト側で変更しないこと）。"""
+    return {
+        name: json_io.read_json(expected_path)
+        for name, _, expected_path in SAMPLE_CASES
+    }
+
+
 @pytest.fixture(params=SAMPLE_CASES, ids=lambda case: case[0])
 def layer1_sample_case(request: pytest.FixtureRequest) -> Iterator[Tuple[str, Path, Path]]:
     yield request.param
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.visualizers import html_visualizer, mermaid_visualizer
+
+
+SAMPLE_FILES = sorted((Path(__file__).resolve().parents[1] / "samples" / "expected").glob("*.json"))
+
+SAMPLE_FLOW = {
+    "actors": [{"id": "actor_sales", "name": "営業"}, {"id": "actor_manager", "name": "部長"}],
+    "phases": [{"id": "phase_apply", "name": "申請"}, {"id": "phase_approve", "name": "承認"}],
+    "tasks": [
+        {"id": "task_apply", "name": "申請書作成", "actor_id": "actor_sales", "phase_id": "phase_apply"},
+        {"id": "task_approve", "name": "部長承認", "actor_id": "actor_manager", "phase_id": "phase_approve"},
+    ],
+    "gateways": [{"id": "gateway_amount", "name": "金額判定", "type": "exclusive"}],
+    "flows": [
+        {"id": "flow_1", "from": "gateway_amount", "to": "task_approve"},
+        {"id": "flow_2", "from": "task_apply", "to": "gateway_amount"},
+    ],
+    "issues": [],
+}
+
+
+def test_gateway_inherits_lane_of_first_connected_task() -> None:
+    layout = html_visualizer.build_layout(SAMPLE_FLOW)
+
+    gateway = layout["gateway_amount"]
+    assert (gateway.actor_idx, gateway.phase_idx) == (1, 1)
+
+
+def test_gateway_cycle_without_tasks_falls_back_to_first_lane() -> None:
+    flow = dict(SAMPLE_FLOW)
+    flow["gateways"] = [
+        {"id": "gateway_a", "name": "A", "type": "exclusive"},
+        {"id": "gateway_b", "name": "B", "type": "exclusive"},
+    ]
+    flow["flows"] = [
+        {"id": "flow_1", "from": "gateway_a", "to": "gateway_b"},
+        {"id": "flow_2", "from": "gateway_b", "to": "gateway_a"},
+    ]
+
+    layout = html_visualizer.build_layout(flow)
+
+    assert (layout["gateway_a"].actor_idx, layout["gateway_a"].phase_idx) == (0, 0)
+    assert (layout["gateway_b"].actor_idx, layout["gateway_b"].phase_idx) == (0, 0)
+
+
+@pytest.mark.parametrize("path", SAMPLE_FILES, ids=lambda path: path.name)
+def test_build_svg_for_sample_files(path: Path) -> None:
+    svg = html_visualizer.build_svg(html_visualizer.load_flow(path))
+    assert svg.startswith("<svg")
+    assert svg.endswith("</svg>")
+
+
+def test_build_svg_escapes_labels() -> None:
+    flow = dict(SAMPLE_FLOW)
+    flow["actors"] = [{"id": "actor_sales", "name": 'R&D <"営業">'}]
+
+    svg = html_visualizer.build_svg(flow)
+
+    assert "R&amp;D &lt;\"営業\"&gt;" in svg
+
+
+def test_flow_loaders_return_independent_documents(tmp_path: Path) -> None:
+    path = tmp_path / "flow.json"
+    path.write_text(json.dumps(SAMPLE_FLOW, ensure_ascii=False), encoding="utf-8")
+
+    # 呼び出し側が読み込み結果を書き換えても、次の読み込みには影響しない
+    html_visualizer.load_flow(path)["tasks"].clear()
+    mermaid_visualizer.load_flow_json(path)["actors"].clear()
+
+    assert html_visualizer.load_flow(path) == SAMPLE_FLOW
+    assert mermaid_visualizer.load_flow_json(path) == SAMPLE_FLOW
+
+
+def test_mermaid_skips_isolated_gateway_without_name() -> None:
+    flow = dict(SAMPLE_FLOW)
+    # フローに接続されていないゲートウェイは出力されないため、name が無くてもよい
+    flow["gateways"] = SAMPLE_FLOW["gateways"] + [{"id": "gateway_orphan", "type": "exclusive"}]
+
+    mermaid = mermaid_visualizer.generate_mermaid(flow)
+
+    assert 'gateway_amount{"金額判定"}' in mermaid
+    assert "gateway_orphan" not in mermaid
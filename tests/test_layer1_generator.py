@@ -2,25 +2,44 @@ from __future__ import annotations
 
 import json
 import os
+import shutil
+import sys
+import threading
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
+import pytest
+
+import src.core.llm_client as llm_builder
 from src.core import generator as layer1_generator
-from src.core.generator import FlowDocument, generate_flow, normalize_flow_document
-from src.core.llm_client import is_dummy_value
+from src.core.exceptions import SchemaValidationError
+from src.core.generator import DummyLLMClient, FlowDocument, generate_flow, normalize_flow_document
+from src.core.llm_client import (
+    CachedLLMClient,
+    _extract_json_payload,
+    cleanup_dummy_proxies,
+    is_dummy_value,
+)
+from src.utils import json_io, run_manager
 
 
 def _load_expected(path: Path) -> dict:
-    return json.loads(path.read_text(encoding="utf-8"))
+    """期待値 JSON を毎回新しく読み込む（内容を書き換えるテスト向け。参照のみなら expected_flows を使う）。"""
+    return json_io.read_json(path)
 
 
-def test_generate_flow_matches_expected(layer1_sample_case: Tuple[str, Path, Path], schema_path: Path) -> None:
+def test_generate_flow_matches_expected(
+    layer1_sample_case: Tuple[str, Path, Path],
+    schema_path: Path,
+    expected_flows: Dict[str, Dict[str, object]],
+) -> None:
     """
     Layer1 ジェネレーターがスタブ JSON と一致することを確認する。
     """
 
-    _, input_path, expected_path = layer1_sample_case
+    name, input_path, expected_path = layer1_sample_case
 
+    # 正規化と JSON Schema 検証を通す経路そのものを確認するため、skip_validation は指定しない
     document: FlowDocument = generate_flow(
         input_path=input_path,
         schema_path=schema_path,
@@ -28,7 +47,7 @@ def test_generate_flow_matches_expected(layer1_sample_case: Tuple[str, Path, Pat
         use_stub=expected_path,
     )
 
-    assert document.to_dict() == _load_expected(expected_path)
+    assert document.to_dict() == expected_flows[name]
 
 
 def test_normalize_flow_document_llm_sample(llm_raw_sample: Dict[str, object]) -> None:
@@ -60,8 +79,6 @@ def test_is_dummy_value_variations() -> None:
 
 
 def test_cleanup_dummy_proxies(monkeypatch) -> None:
-    from src.core.llm_client import cleanup_dummy_proxies
-
     monkeypatch.setenv("HTTP_PROXY", "http://XXX.XX.X.XX:XXXX")
     monkeypatch.setenv("HTTPS_PROXY", "http://valid.proxy:8080")
 
@@ -71,9 +88,15 @@ def test_cleanup_dummy_proxies(monkeypatch) -> None:
     assert os.environ["HTTPS_PROXY"] == "http://valid.proxy:8080"
 
 
-def test_detect_provider_prefers_azure(monkeypatch) -> None:
-    import src.core.llm_client as llm_builder
+def test_cleanup_dummy_proxies_with_explicit_env() -> None:
+    env = {"HTTP_PROXY": "http://XXX.XX.X.XX:XXXX", "HTTPS_PROXY": "http://valid.proxy:8080"}
+
+    cleanup_dummy_proxies(env)
+
+    assert env == {"HTTPS_PROXY": "http://valid.proxy:8080"}
 
+
+def test_detect_provider_prefers_azure(monkeypatch) -> None:
     monkeypatch.setattr(llm_builder, "_PROVIDER_CACHE", None, raising=False)
     monkeypatch.setattr(llm_builder, "_PROVIDER_ERRORS", [], raising=False)
     monkeypatch.setattr(llm_builder, "validate_azure_env", lambda: True)
@@ -83,8 +106,6 @@ def test_detect_provider_prefers_azure(monkeypatch) -> None:
 
 
 def test_detect_provider_handles_missing_env(monkeypatch) -> None:
-    import src.core.llm_client as llm_builder
-
     monkeypatch.setattr(llm_builder, "_PROVIDER_CACHE", None, raising=False)
     monkeypatch.setattr(llm_builder, "_PROVIDER_ERRORS", [], raising=False)
     monkeypatch.setattr(llm_builder, "validate_azure_env", lambda: False)
@@ -94,38 +115,44 @@ def test_detect_provider_handles_missing_env(monkeypatch) -> None:
     assert llm_builder._PROVIDER_ERRORS  # type: ignore[attr-defined]
 
 
-def test_generate_flow_records_generation_metadata(monkeypatch, tmp_path: Path, schema_path: Path) -> None:
-    import src.core.llm_client as llm_builder
-
+class _FakeMetadataClient:
+    """generation メタデータ記録の確認用に固定レスポンスを返すクライアント。"""
+
+    def structured_flow(self, *, messages: List[Dict[str, str]], schema: Dict[str, object], model: str) -> Dict[str, object]:
+        _ = messages, schema, model
+        return {
+            "actors": [{"id": "actor_1", "name": "Sales"}],
+            "phases": [{"id": "phase_1", "name": "Plan"}],
+            "tasks": [
+                {
+                    "id": "task_1",
+                    "name": "Review request",
+                    "actor_id": "actor_1",
+                    "phase_id": "phase_1",
+                }
+            ],
+            "flows": [{"id": "flow_1", "from": "task_1", "to": "task_1"}],
+            "issues": [{"id": "issue_1", "note": "none"}],
+            "metadata": {
+                "id": "flow_1",
+                "title": "Demo",
+                "source": "tests/data/demo.md",
+                "last_updated": "2025-01-01",
+            },
+        }
+
+
+@pytest.mark.parametrize(
+    ("provider", "model"),
+    [("openai", "gpt-test"), ("azure", "gpt-4.1-mini")],
+    ids=["openai", "azure"],
+)
+def test_generate_flow_records_generation_metadata(
+    monkeypatch, tmp_path: Path, schema_path: Path, provider: str, model: str
+) -> None:
     monkeypatch.setattr(llm_builder, "_PROVIDER_CACHE", None, raising=False)
     monkeypatch.setattr(llm_builder, "_PROVIDER_ERRORS", [], raising=False)
-
-    class FakeClient:
-        def structured_flow(self, *, messages: List[Dict[str, str]], schema: Dict[str, object], model: str) -> Dict[str, object]:
-            _ = messages, schema, model
-            return {
-                "actors": [{"id": "actor_1", "name": "Sales"}],
-                "phases": [{"id": "phase_1", "name": "Plan"}],
-                "tasks": [
-                    {
-                        "id": "task_1",
-                        "name": "Review request",
-                        "actor_id": "actor_1",
-                        "phase_id": "phase_1",
-                    }
-                ],
-                "flows": [{"id": "flow_1", "from": "task_1", "to": "task_1"}],
-                "issues": [{"id": "issue_1", "note": "none"}],
-                "metadata": {
-                    "id": "flow_1",
-                    "title": "Demo",
-                    "source": "tests/data/demo.md",
-                    "last_updated": "2025-01-01",
-                },
-            }
-
-    monkeypatch.setattr(llm_builder, "create_llm_client", lambda: FakeClient())
-    monkeypatch.setattr(llm_builder, "detect_provider", lambda: "openai")
+    monkeypatch.setattr(llm_builder, "create_llm_client", lambda: (_FakeMetadataClient(), provider))
 
     input_path = tmp_path / "input.md"
     input_path.write_text("demo input", encoding="utf-8")
@@ -133,10 +160,276 @@ def test_generate_flow_records_generation_metadata(monkeypatch, tmp_path: Path,
     document = generate_flow(
         input_path=input_path,
         schema_path=schema_path,
-        model="gpt-test",
+        model=model,
         use_stub=None,
         skip_validation=True,
     )
 
     assert document.metadata is not None
-    assert document.metadata["generation"] == {"model": "gpt-test", "provider": "openai"}
+    assert document.metadata["generation"] == {"model": model, "provider": provider}
+
+
+def test_validate_reuses_compiled_validator(
+    schema_path: Path, expected_flows: Dict[str, Dict[str, object]]
+) -> None:
+    schema = layer1_generator.load_schema(schema_path)
+    document = expected_flows["tiny"]
+
+    if layer1_generator.fastjsonschema is not None:
+        compiled = layer1_generator._get_fast_validator
+    else:
+        compiled = layer1_generator._get_validator
+
+    compiled.cache_clear()
+    layer1_generator.validate(document, schema)
+    layer1_generator.validate(document, dict(schema))
+
+    info = compiled.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+
+def test_schema_key_is_computed_once_for_loaded_schema(monkeypatch, schema_path: Path) -> None:
+    schema = layer1_generator.load_schema(schema_path)
+    key = layer1_generator._schema_key(schema)
+
+    def fail(_schema):
+        raise AssertionError("load_schema 由来のスキーマを再シリアライズした")
+
+    monkeypatch.setattr(layer1_generator, "_serialize_schema", fail)
+
+    assert layer1_generator._schema_key(schema) == key
+
+
+def test_extract_json_payload_strips_code_fence() -> None:
+    assert _extract_json_payload('```json\n{"a": 1}\n```') == '{"a": 1}'
+    assert _extract_json_payload('```\n{"a": 1}\n```\n') == '{"a": 1}'
+    assert _extract_json_payload('```json\n{"a": 1}') == '{"a": 1}'
+    assert _extract_json_payload(' {"a": 1} ') == '{"a": 1}'
+
+
+def test_create_llm_client_reuses_instance(monkeypatch) -> None:
+    created = []
+
+    class FakeOpenAIClient:
+        def __init__(self) -> None:
+            created.append(self)
+
+    monkeypatch.setattr(llm_builder, "_CLIENT_CACHE", {})
+    monkeypatch.setattr(llm_builder, "detect_provider", lambda: "openai")
+    monkeypatch.setattr(llm_builder, "OpenAILLMClient", FakeOpenAIClient)
+
+    first, provider = llm_builder.create_llm_client()
+    second, _ = llm_builder.create_llm_client()
+
+    assert provider == "openai"
+    assert first is second
+    assert len(created) == 1
+
+
+def test_validate_with_jsonschema_backend_skips_fast_validator(
+    schema_path: Path, expected_flows: Dict[str, Dict[str, object]]
+) -> None:
+    schema = layer1_generator.load_schema(schema_path)
+    document = expected_flows["tiny"]
+
+    layer1_generator._get_fast_validator.cache_clear()
+    layer1_generator.validate(document, schema, backend="jsonschema")
+
+    assert layer1_generator._get_fast_validator.cache_info().currsize == 0
+
+
+def test_copy_input_file_returns_source_hash(tmp_path: Path) -> None:
+    src = tmp_path / "input.md"
+    src.write_bytes("業務フロー\n".encode("utf-8") * 1000)
+    run_dir = tmp_path / "run"
+    run_dir.mkdir()
+
+    digest = run_manager.copy_input_file(src, run_dir)
+
+    assert (run_dir / "input.md").read_bytes() == src.read_bytes()
+    assert digest == run_manager._calculate_file_hash(src)
+
+
+def test_copy_input_file_rejects_source_inside_run_dir(tmp_path: Path) -> None:
+    src = tmp_path / "input.md"
+    src.write_bytes("業務フロー\n".encode("utf-8"))
+
+    with pytest.raises(shutil.SameFileError):
+        run_manager.copy_input_file(src, tmp_path)
+
+    assert src.read_bytes() == "業務フロー\n".encode("utf-8")
+
+
+@pytest.mark.parametrize("limit", [10, 2, 0, -1, -5])
+def test_list_runs_matches_sorted_slice(tmp_path: Path, limit: int) -> None:
+    names = ["20251110_120000_b", "20251111_090000_a", "20251109_235959_c", ".llm-cache"]
+    for name in names:
+        (tmp_path / name).mkdir()
+
+    expected = sorted((tmp_path / name for name in names if not name.startswith(".")), reverse=True)[:limit]
+
+    assert run_manager.list_runs(tmp_path, limit=limit) == expected
+
+
+def test_generate_flow_normalizes_schema_valid_document_with_name_references(
+    tmp_path: Path, schema_path: Path
+) -> None:
+    document = _load_expected(Path("samples/expected/sample-tiny-01.json"))
+    first_actor = document["actors"][0]
+    document["tasks"][0]["actor_id"] = first_actor["name"]
+    stub_path = tmp_path / "stub.json"
+    stub_path.write_text(json.dumps(document, ensure_ascii=False), encoding="utf-8")
+
+    generated = generate_flow(
+        input_path=Path("samples/input/sample-tiny-01.md"),
+        schema_path=schema_path,
+        model="gpt-4.1-mini",
+        use_stub=stub_path,
+    )
+
+    assert generated.tasks[0]["actor_id"] == first_actor["id"]
+
+
+def test_cached_llm_client_reuses_response(tmp_path: Path) -> None:
+    calls = []
+
+    class CountingClient:
+        def structured_flow(self, *, messages, schema, model):
+            calls.append(model)
+            return {"actors": [{"id": "actor_1", "name": "営業"}]}
+
+    client = CachedLLMClient(CountingClient(), tmp_path / "cache", provider="openai")
+    messages = [{"role": "user", "content": "demo"}]
+
+    first = client.structured_flow(messages=messages, schema={}, model="gpt-test")
+    # commit() 前は保存されないため、同じリクエストでも再度 API を呼ぶ
+    client.structured_flow(messages=messages, schema={}, model="gpt-test")
+    client.commit()
+    second = client.structured_flow(messages=messages, schema={}, model="gpt-test")
+    client.structured_flow(messages=messages, schema={}, model="gpt-other")
+    CachedLLMClient(CountingClient(), tmp_path / "cache", provider="azure").structured_flow(
+        messages=messages, schema={}, model="gpt-test"
+    )
+
+    assert first == second
+    assert calls == ["gpt-test", "gpt-test", "gpt-other", "gpt-test"]
+
+
+def test_generate_flow_caches_only_validated_responses(monkeypatch, tmp_path: Path, schema_path: Path) -> None:
+    # 1件目は正規化はできるがスキーマ検証（actors の最小件数など）に通らない応答
+    invalid = {"actors": [], "phases": [], "tasks": [], "flows": [], "issues": []}
+    responses = [invalid, _FakeMetadataClient().structured_flow(messages=[], schema={}, model="")]
+
+    class SequenceClient:
+        def structured_flow(self, *, messages, schema, model):
+            return responses.pop(0)
+
+    monkeypatch.setattr(llm_builder, "create_llm_client", lambda: (SequenceClient(), "openai"))
+    input_path = tmp_path / "input.md"
+    input_path.write_text("demo input", encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+
+    # validate() は jsonschema があればその ValidationError、なければ SchemaValidationError を送出する
+    if layer1_generator.jsonschema is not None:
+        validation_error = layer1_generator.jsonschema.exceptions.ValidationError
+    else:
+        validation_error = SchemaValidationError
+    with pytest.raises(validation_error):
+        generate_flow(input_path=input_path, schema_path=schema_path, model="gpt-test", cache_dir=cache_dir)
+    assert not cache_dir.exists()
+
+    first = generate_flow(input_path=input_path, schema_path=schema_path, model="gpt-test", cache_dir=cache_dir)
+    second = generate_flow(input_path=input_path, schema_path=schema_path, model="gpt-test", cache_dir=cache_dir)
+
+    assert len(list(cache_dir.glob("*.json"))) == 1
+    assert second.to_dict() == first.to_dict()
+    assert responses == []
+
+
+def test_generate_flow_normalizes_schema_valid_document_missing_optional_fields(
+    tmp_path: Path, schema_path: Path
+) -> None:
+    document = _load_expected(Path("samples/expected/sample-tiny-01.json"))
+    for actor in document["actors"]:
+        actor.pop("type", None)
+    document.pop("gateways", None)
+    document.pop("metadata", None)
+    # スキーマ上は省略可能な項目だけを落としたスタブであることを前提にする
+    layer1_generator.validate(document, layer1_generator.load_schema(schema_path))
+    stub_path = tmp_path / "stub.json"
+    stub_path.write_text(json.dumps(document, ensure_ascii=False), encoding="utf-8")
+
+    generated = generate_flow(
+        input_path=Path("samples/input/sample-tiny-01.md"),
+        schema_path=schema_path,
+        model="gpt-4.1-mini",
+        use_stub=stub_path,
+    )
+
+    assert generated.to_dict() == normalize_flow_document(document)
+    assert all(actor["type"] == "human" for actor in generated.actors)
+    assert generated.gateways == []
+    assert set(generated.metadata) == {"id", "title", "source", "last_updated"}
+
+
+def _run_generator_cli(monkeypatch, *argv: str) -> None:
+    monkeypatch.setattr(sys, "argv", ["generator", *argv])
+    layer1_generator.main()
+
+
+def test_batch_mode_writes_each_output_and_reports_failures(
+    monkeypatch, tmp_path: Path, schema_path: Path
+) -> None:
+    inputs_dir = tmp_path / "inputs"
+    inputs_dir.mkdir()
+    for stem in ("alpha", "beta", "gamma"):
+        (inputs_dir / f"{stem}.md").write_text(f"{stem} の業務フロー", encoding="utf-8")
+    # UTF-8 として読めない入力は失敗として数えられ、他のファイルの処理は継続する
+    (inputs_dir / "broken.md").write_bytes(b"\xff\xfe\xfa")
+    output_dir = tmp_path / "out"
+    stub = "samples/expected/sample-tiny-01.json"
+    argv = ("--inputs-dir", str(inputs_dir), "--output", str(output_dir), "--stub", stub, "--schema", str(schema_path))
+
+    failures = []
+    monkeypatch.setattr(layer1_generator.logger, "error", failures.append)
+    with pytest.raises(SystemExit) as excinfo:
+        _run_generator_cli(monkeypatch, *argv)
+
+    assert excinfo.value.code == 1
+    assert len(failures) == 1 and "broken.md" in failures[0]
+    assert sorted(path.name for path in output_dir.iterdir()) == ["alpha.json", "beta.json", "gamma.json"]
+    expected = json_io.read_json(Path(stub))
+    for path in output_dir.iterdir():
+        assert json_io.read_json(path) == expected
+
+    # 全件成功した場合は終了コード 0（SystemExit を送出しない）
+    (inputs_dir / "broken.md").unlink()
+    retry_dir = tmp_path / "retry"
+    _run_generator_cli(monkeypatch, *argv[:2], "--output", str(retry_dir), *argv[4:])
+    assert len(list(retry_dir.glob("*.json"))) == 3
+
+
+def test_batch_mode_creates_llm_client_once_before_workers(
+    monkeypatch, tmp_path: Path, schema_path: Path
+) -> None:
+    inputs_dir = tmp_path / "inputs"
+    inputs_dir.mkdir()
+    for stem in ("alpha", "beta", "gamma", "delta"):
+        (inputs_dir / f"{stem}.md").write_text(f"{stem} の業務フロー", encoding="utf-8")
+    stub_client = DummyLLMClient(Path("samples/expected/sample-tiny-01.json"))
+    calling_threads = []
+
+    def fake_create_llm_client():
+        calling_threads.append(threading.current_thread())
+        return stub_client, "openai"
+
+    # プロバイダ検出とクライアント生成はワーカーではなくメインスレッドで1度だけ行われる
+    monkeypatch.setattr(layer1_generator.llm_client, "create_llm_client", fake_create_llm_client)
+    output_dir = tmp_path / "out"
+    _run_generator_cli(
+        monkeypatch, "--inputs-dir", str(inputs_dir), "--output", str(output_dir), "--schema", str(schema_path)
+    )
+
+    assert calling_threads == [threading.main_thread()]
+    assert len(list(output_dir.glob("*.json"))) == 4